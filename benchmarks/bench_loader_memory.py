@@ -0,0 +1,137 @@
+"""
+Compare the memory used by the original and the compact CSV loading paths.
+
+Generates a TRANSACTIONS-like CSV and, in a separate process per mode, either
+parses it (and serializes it for COPY) or loads it into the database when
+--database-url is given. Reports peak RSS and the in-memory size of the parsed
+frames, scaled to one million rows.
+
+Usage:
+    python -m benchmarks.bench_loader_memory --rows 1000000
+    python -m benchmarks.bench_loader_memory --rows 1000000 --database-url postgresql://...
+"""
+import argparse
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import numpy as np
+
+COLUMN_TYPES = {"ACCOUNT_GUID": "VARCHAR", "TRANSACTION_AMOUNT": "NUMERIC(38,2)", "POST_DATE": "DATE"}
+
+def generate_csv(path, rows, accounts=10000, seed=0):
+    """
+    Write a TRANSACTIONS-like CSV with repeating account GUIDs and dates.
+    """
+    import pandas as pd
+    rng = np.random.default_rng(seed)
+    guids = np.array([f"{i:08x}-cf66-11ee-ae57-e00af6801390" for i in range(accounts)])
+    dates = pd.date_range("2021-01-01", "2023-12-31").strftime("%Y-%m-%d").to_numpy()
+    pd.DataFrame({
+        "ACCOUNT_GUID": guids[rng.integers(0, accounts, rows)],
+        "TRANSACTION_AMOUNT": np.round(rng.normal(0, 2500, rows), 2),
+        "POST_DATE": dates[rng.integers(0, len(dates), rows)],
+    }).to_csv(path, index=False)
+
+def peak_rss_mb():
+    """
+    Return this process's peak RSS in MB.
+
+    VmHWM is used where available because ru_maxrss carries over the parent's peak across exec.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KB on Linux
+
+def run_mode(mode, path, database_url=None, chunksize=100000):
+    """
+    Run one loading path and return its measurements.
+    """
+    import pandas as pd
+    from sqlalchemy import create_engine
+    from src import loader
+
+    engine = create_engine(database_url) if database_url else None
+    rss_after_imports = peak_rss_mb()
+    rows = 0
+    largest_chunk = 0
+    if mode == "original":
+        df = pd.read_csv(path)
+        largest_chunk = int(df.memory_usage(deep=True).sum())
+        if engine is not None:
+            df.to_sql("TRANSACTIONS", engine, if_exists="append", index=False)
+        else:
+            df.to_csv(io.StringIO(), header=False, index=False)
+        rows = len(df)
+    else:
+        conn = engine.connect() if engine is not None else None
+        for chunk in loader.read_csv_compact(path, COLUMN_TYPES, chunksize):
+            largest_chunk = max(largest_chunk, int(chunk.memory_usage(deep=True).sum()))
+            if conn is not None:
+                rows += loader.copy_frame(conn, "TRANSACTIONS", chunk, COLUMN_TYPES)
+            else:
+                # Same serialization as copy_frame, written to a throwaway buffer
+                out = chunk.copy(deep=False)
+                out["TRANSACTION_AMOUNT"] = loader.format_scaled_int(chunk["TRANSACTION_AMOUNT"], 2)
+                out.to_csv(io.StringIO(), header=False, index=False)
+                rows += len(chunk)
+        if conn is not None:
+            conn.commit()
+            conn.close()
+    peak = peak_rss_mb()
+
+    # In-memory size of the whole file in each representation, measured after the peak
+    if mode == "original":
+        whole_frame = largest_chunk
+    else:
+        whole = next(loader.read_csv_compact(path, COLUMN_TYPES, chunksize=rows + 1))
+        whole_frame = int(whole.memory_usage(deep=True).sum())
+    return {
+        "rows": rows,
+        "peak_rss_mb": peak,
+        "rss_after_imports_mb": rss_after_imports,
+        "largest_chunk_mb": largest_chunk / 2 ** 20,
+        "whole_frame_mb": whole_frame / 2 ** 20,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--chunksize", type=int, default=100000)
+    parser.add_argument("--database-url", default=None, help="Also write to a TRANSACTIONS table in this database")
+    parser.add_argument("--mode", choices=["original", "compact"], help=argparse.SUPPRESS)
+    parser.add_argument("--file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.file, args.database_url, args.chunksize)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "TRANSACTIONS.csv")
+        generate_csv(path, args.rows)
+        print(f"{args.rows:,} rows, {os.path.getsize(path) / 2 ** 20:.1f} MB CSV")
+        for mode in ("original", "compact"):
+            cmd = [sys.executable, "-m", "benchmarks.bench_loader_memory", "--mode", mode, "--file", path,
+                   "--chunksize", str(args.chunksize)]
+            if args.database_url:
+                cmd += ["--database-url", args.database_url]
+            result = json.loads(subprocess.run(cmd, check=True, capture_output=True, text=True).stdout)
+            per_million = 1e6 / max(result["rows"], 1)
+            print(
+                f"{mode:>8}: peak RSS {result['peak_rss_mb']:.0f} MB "
+                f"(+{result['peak_rss_mb'] - result['rss_after_imports_mb']:.0f} MB over imports) | "
+                f"whole frame {result['whole_frame_mb'] * per_million:.1f} MB per 1M rows | "
+                f"largest chunk in memory {result['largest_chunk_mb']:.1f} MB"
+            )
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,74 @@
 import sys
-import os
+import importlib
 import click
-from . import schema_builder, loader, queries
-from .config import DEFAULT_DATA_DIR, DEFAULT_SCHEMA_FILE
-from .db import get_engine, get_session
-from sqlalchemy import text
-from sqlalchemy.exc import ProgrammingError
+from .config import DEFAULT_DATA_DIR, DEFAULT_PLAN_DIR, DEFAULT_SCHEMA_FILE
+
+# Modules that pull in pandas or SQLAlchemy are imported on first use, so that
+# --help and short commands do not pay for them. They resolve through the module
+# __getattr__ below and stay patchable as attributes of this module.
+_LAZY_ATTRS = {
+    "schema_builder": (".schema_builder", None),
+    "loader": (".loader", None),
+    "queries": (".queries", None),
+    "watcher": (".watcher", None),
+    "explain": (".explain", None),
+    "integrity": (".integrity", None),
+    "get_engine": (".db", "get_engine"),
+    "get_pool_stats": (".db", "get_pool_stats"),
+}
+
+def __getattr__(name):
+    """
+    Import a lazily loaded module or function on first attribute access.
+    """
+    if name not in _LAZY_ATTRS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attr = _LAZY_ATTRS[name]
+    value = importlib.import_module(module_name, __package__)
+    if attr:
+        value = getattr(value, attr)
+    globals()[name] = value
+    return value
+
+def _lazy(name):
+    """
+    Return a lazily loaded attribute, preferring a value already set on this module.
+    """
+    return globals()[name] if name in globals() else __getattr__(name)
+
+def _report_integrity(engine, schema, sample_size, add_constraints=False):
+    """
+    Check the relationships declared in the schema for orphan rows and print the results.
+
+    Args:
+        engine: SQLAlchemy engine instance connected to the target database.
+        schema (str): Path to the schema CSV file.
+        sample_size (int): Maximum number of orphan keys printed per relationship.
+        add_constraints (bool): Add foreign keys for relationships without orphans.
+
+    Returns:
+        bool: True if no orphan rows were found.
+    """
+    integrity = _lazy("integrity")
+    reports = integrity.check_integrity(engine, schema, sample_size)
+    if not reports:
+        click.echo(f"No relationships declared in {schema}.")
+        return True
+
+    for report in reports:
+        label = integrity.describe(report.relationship)
+        if not report.orphan_rows:
+            click.echo(f"{label}: OK")
+            continue
+        click.secho(f"{label}: {report.orphan_rows} orphan rows ({report.orphan_keys} keys)", fg="red")
+        for key, row_count in report.samples:
+            click.secho(f"    {key} ({row_count} rows)", fg="red")
+
+    if add_constraints:
+        clean = [report.relationship for report in reports if not report.orphan_rows]
+        for relationship, status in integrity.add_foreign_keys(engine, clean).items():
+            click.echo(f"{integrity.describe(relationship)}: {status}")
+    return not any(report.orphan_rows for report in reports)
 
 @click.group()
 def cli():
@@ -27,15 +90,24 @@ def cli():
     show_default=True,
     help="Directory containing CSV files to load"
 )
-def load(schema, data_dir):
+@click.option(
+    "--check-integrity",
+    "check_integrity",
+    is_flag=True,
+    help="Check the relationships declared in the schema for orphan rows after loading"
+)
+def load(schema, data_dir, check_integrity):
     """
     Create tables from schema and load data into database.
     """
     click.echo(f"Using schema: {schema}")
     click.echo(f"Loading CSVs from: {data_dir}")
+    get_engine = _lazy("get_engine")
+    schema_builder = _lazy("schema_builder")
+    loader = _lazy("loader")
 
     try:
-        engine = get_engine()
+        engine = get_engine("bulk")
     except Exception as e:
         click.secho(f"Error connecting to the database: {e}", fg="red", err=True)
         sys.exit(1)
@@ -54,40 +126,152 @@ def load(schema, data_dir):
 
     click.secho("Data loading completed successfully.", fg="green")
 
+    if check_integrity:
+        click.echo("\nChecking referential integrity:")
+        try:
+            clean = _report_integrity(engine, schema, sample_size=5)
+        except Exception as e:
+            click.secho(f"Error checking integrity: {e}", fg="red", err=True)
+            sys.exit(1)
+        if not clean:
+            click.secho("Orphan rows found.", fg="red", err=True)
+            sys.exit(1)
+
 @cli.command()
-def run_queries():
+@click.option(
+    "--schema",
+    type=click.Path(exists=True),
+    default=DEFAULT_SCHEMA_FILE,
+    show_default=True,
+    help="Path to INFORMATION_SCHEMA.csv"
+)
+@click.option(
+    "--data-dir",
+    type=click.Path(exists=True),
+    default=DEFAULT_DATA_DIR,
+    show_default=True,
+    help="Directory to watch for new or appended CSV files"
+)
+@click.option("--interval", type=float, default=5.0, show_default=True, help="Seconds between directory polls")
+@click.option("--batch-size", type=click.IntRange(min=1), default=1000, show_default=True, help="Maximum rows inserted per batch")
+@click.option("--queue-size", type=click.IntRange(min=1), default=8, show_default=True, help="Maximum pending batches before polling waits")
+@click.option(
+    "--state-file",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="JSON file that records ingested offsets so a restart does not reload rows"
+)
+def watch(schema, data_dir, interval, batch_size, queue_size, state_file):
+    """
+    Continuously ingest new or appended CSV rows until interrupted.
+    """
+    click.echo(f"Using schema: {schema}")
+    click.echo(f"Watching CSVs in: {data_dir} (every {interval}s, Ctrl+C to stop)")
+    get_engine = _lazy("get_engine")
+    watcher = _lazy("watcher")
+
+    try:
+        engine = get_engine("bulk")
+    except Exception as e:
+        click.secho(f"Error connecting to the database: {e}", fg="red", err=True)
+        sys.exit(1)
+
+    try:
+        watcher.CsvWatcher(
+            engine,
+            data_dir=data_dir,
+            schema_file=schema,
+            interval=interval,
+            batch_size=batch_size,
+            queue_size=queue_size,
+            state_file=state_file,
+        ).run()
+    except Exception as e:
+        click.secho(f"Error watching CSV files: {e}", fg="red", err=True)
+        sys.exit(1)
+
+    stats = _lazy("get_pool_stats")(engine)
+    click.echo("Connection pool: " + ", ".join(f"{key}={value}" for key, value in stats.items()))
+    click.secho("Watcher stopped.", fg="green")
+
+@cli.command()
+@click.argument("names", nargs=-1)
+@click.option("--list", "list_reports", is_flag=True, help="List the registered reports and their parameters")
+@click.option("--member-guid", "member_guids", multiple=True, help="Only include this member (repeatable)")
+@click.option("--account-guid", "account_guids", multiple=True, help="Only include this account (repeatable)")
+@click.option("--as-of", "as_of_date", type=click.DateTime(formats=["%Y-%m-%d"]), default=None, help="Only include transactions posted on or before this date (YYYY-MM-DD)")
+@click.option("--min-overdraft", type=str, default=None, help="Only include overdrafts of at least this amount")
+@click.option(
+    "--explain",
+    "explain_plans",
+    is_flag=True,
+    help="Run each query under EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) and save the plans instead of printing results"
+)
+@click.option(
+    "--plan-dir",
+    type=click.Path(file_okay=False),
+    default=DEFAULT_PLAN_DIR,
+    show_default=True,
+    help="Directory to save plans in when using --explain"
+)
+def run_queries(names, list_reports, member_guids, account_guids, as_of_date, min_overdraft, explain_plans, plan_dir):
     """
     Run analysis queries and print results.
+
+    NAMES selects reports to run (default: all registered reports).
     """
+    from decimal import Decimal, InvalidOperation
+    from sqlalchemy.exc import ProgrammingError
+    queries = _lazy("queries")
+
     try:
-        click.echo("Overdrawn Checking Accounts:")
-        rows = queries.overdrawn_checking_accounts()
-        if rows:
-            for row in rows:
-                data = row._mapping
-                click.echo(
-                    f"Member: {data['FIRST_NAME']} {data['LAST_NAME']} | "
-                    f"Account: {data['ACCOUNT_GUID']} | "
-                    f"Balance: {data['balance']}"
-                )
-        else:
-            click.echo("None found.")
+        queries.load_report_plugins()
+        reports = [queries.get_report(name) for name in (names or queries.REPORTS)]
+    except Exception as e:
+        click.secho(f"Error loading reports: {e}", fg="red", err=True)
+        sys.exit(1)
 
-        click.echo("\nOverpaid Loans:")
-        rows = queries.overpaid_loans()
-        if rows:
-            for row in rows:
-                data = row._mapping
+    if list_reports:
+        for report in reports:
+            params = ", ".join(f"{param.name} ({param.pg_type})" for param in report.params) or "none"
+            click.echo(f"{report.name}: {report.title} | Parameters: {params}")
+        return
+
+    params = {}
+    if member_guids:
+        params["member_guids"] = list(member_guids)
+    if account_guids:
+        params["account_guids"] = list(account_guids)
+    if as_of_date is not None:
+        params["as_of_date"] = as_of_date.date()
+    if min_overdraft is not None:
+        try:
+            params["min_overdraft"] = Decimal(min_overdraft)
+        except InvalidOperation:
+            click.secho(f"Invalid --min-overdraft amount: {min_overdraft}", fg="red", err=True)
+            sys.exit(1)
+
+    try:
+        if explain_plans:
+            records = _lazy("explain").capture_plans([report.name for report in reports], plan_dir, params)
+            for name, record in records.items():
                 click.echo(
-                    f"Member: {data['FIRST_NAME']} {data['LAST_NAME']} | "
-                    f"Account: {data['ACCOUNT_GUID']} | "
-                    f"Overpaid Amount: {data['overpaid_amount']}"
+                    f"{name}: planning {record['planning_time_ms']:.2f} ms | "
+                    f"execution {record['execution_time_ms']:.2f} ms"
                 )
-        else:
-            click.echo("None found.")
+            click.echo(f"\nPlans saved to: {plan_dir}")
+            return
 
-        click.echo("\nTotal Assets:")
-        click.echo(f"{queries.total_assets():,.2f}")
+        for i, report in enumerate(reports):
+            # Each report only receives the parameters it declares
+            report_params = {key: value for key, value in params.items() if key in report.param_names}
+            click.echo(("\n" if i else "") + f"{report.title}:")
+            rows = queries.run_report(report.name, report_params)
+            if rows:
+                for row in rows:
+                    click.echo(report.format_row(row))
+            else:
+                click.echo("None found.")
     except ProgrammingError as e:
         if "does not exist" in str(e):
             click.secho(
@@ -101,5 +285,92 @@ def run_queries():
         click.secho(f"Error running queries: {e}", fg="red", err=True)
         sys.exit(1)
 
+@cli.command()
+@click.option(
+    "--baseline",
+    type=click.Path(exists=True, file_okay=False),
+    required=True,
+    help="Directory with baseline plans"
+)
+@click.option(
+    "--current",
+    type=click.Path(exists=True, file_okay=False),
+    default=DEFAULT_PLAN_DIR,
+    show_default=True,
+    help="Directory with plans captured by 'run-queries --explain'"
+)
+@click.option("--runtime-threshold", type=float, default=0.5, show_default=True, help="Allowed relative execution time growth")
+@click.option("--min-runtime-ms", type=float, default=1.0, show_default=True, help="Ignore execution time growth below this many ms")
+@click.option("--estimate-threshold", type=float, default=10.0, show_default=True, help="Allowed ratio between actual and estimated rows")
+def check_plans(baseline, current, runtime_threshold, min_runtime_ms, estimate_threshold):
+    """
+    Compare captured query plans with baselines and report regressions.
+    """
+    try:
+        regressions = _lazy("explain").check_plans(
+            baseline,
+            current,
+            runtime_threshold=runtime_threshold,
+            min_runtime_ms=min_runtime_ms,
+            estimate_threshold=estimate_threshold,
+        )
+    except Exception as e:
+        click.secho(f"Error checking plans: {e}", fg="red", err=True)
+        sys.exit(1)
+
+    if regressions:
+        click.secho("Plan regressions found:", fg="red", err=True)
+        for regression in regressions:
+            click.secho(f"  {regression}", fg="red", err=True)
+        sys.exit(1)
+    click.secho("No plan regressions found.", fg="green")
+
+@cli.command()
+@click.option(
+    "--schema",
+    type=click.Path(exists=True),
+    default=DEFAULT_SCHEMA_FILE,
+    show_default=True,
+    help="Path to INFORMATION_SCHEMA.csv"
+)
+@click.option("--sample-size", type=click.IntRange(min=0), default=5, show_default=True, help="Orphan keys shown per relationship")
+@click.option(
+    "--add-constraints",
+    is_flag=True,
+    help="Add foreign keys (NOT VALID, then validated) for relationships without orphan rows"
+)
+def check_integrity(schema, sample_size, add_constraints):
+    """
+    Report rows whose keys are missing from the tables they reference.
+    """
+    from sqlalchemy.exc import ProgrammingError
+    get_engine = _lazy("get_engine")
+
+    try:
+        engine = get_engine("bulk")
+    except Exception as e:
+        click.secho(f"Error connecting to the database: {e}", fg="red", err=True)
+        sys.exit(1)
+
+    try:
+        clean = _report_integrity(engine, schema, sample_size, add_constraints)
+    except ProgrammingError as e:
+        if "does not exist" in str(e):
+            click.secho(
+                "Database tables do not exist. Please run the 'load' command first.",
+                fg="red", err=True
+            )
+        else:
+            click.secho(f"Error checking integrity: {e}", fg="red", err=True)
+        sys.exit(1)
+    except Exception as e:
+        click.secho(f"Error checking integrity: {e}", fg="red", err=True)
+        sys.exit(1)
+
+    if not clean:
+        click.secho("Orphan rows found.", fg="red", err=True)
+        sys.exit(1)
+    click.secho("No orphan rows found.", fg="green")
+
 if __name__ == "__main__":
     cli()
@@ -6,5 +6,134 @@ DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "dat
 # DEFAULT_SCHEMA_FILE points to the INFORMATION_SCHEMA.csv file inside the default data directory.
 DEFAULT_SCHEMA_FILE = os.path.join(DEFAULT_DATA_DIR, "INFORMATION_SCHEMA.csv")
 
+# DEFAULT_PLAN_DIR is where run-queries --explain saves captured query plans.
+DEFAULT_PLAN_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "plans")
+
+# Number of CSV rows read and written per chunk when loading.
+LOAD_CHUNK_SIZE = int(os.getenv("CSV_LOADER_CHUNK_SIZE", "100000"))
+
 # Get the database URL from an environment variable.
-DATABASE_URL = os.getenv("DATABASE_URL")
\ No newline at end of file
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+# Directory for the compiled schema cache; override with CSV_LOADER_CACHE_DIR.
+SCHEMA_CACHE_DIR = os.getenv(
+    "CSV_LOADER_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "csv_loader")
+)
+
+# Optional INI file with [engine] and [engine:<profile>] sections overriding engine settings.
+CONFIG_FILE = os.getenv("CSV_LOADER_CONFIG")
+
+# Engine settings shared by every profile unless overridden.
+ENGINE_DEFAULTS = {
+    "pool_size": 5,
+    "max_overflow": 10,
+    "pool_timeout": 30.0,
+    "pool_recycle": 1800,
+    "pool_pre_ping": True,
+    "executemany_mode": None,
+    "insert_page_size": None,
+    "application_name": "csv_loader",
+    "statement_timeout": None,
+    "lock_timeout": None,
+    "work_mem": None,
+    "maintenance_work_mem": None,
+    "synchronous_commit": None,
+    "plan_cache_mode": None,
+}
+
+# Built-in profiles: "bulk" for loading CSV data, "analytics" for report queries.
+ENGINE_PROFILES = {
+    "default": {},
+    "bulk": {
+        "pool_size": 2,
+        "max_overflow": 2,
+        "executemany_mode": "values_plus_batch",
+        "insert_page_size": 10000,
+        "statement_timeout": "0",
+        "work_mem": "64MB",
+        "maintenance_work_mem": "256MB",
+    },
+    "analytics": {
+        "pool_size": 5,
+        "max_overflow": 5,
+        "statement_timeout": "10min",
+        "work_mem": "128MB",
+        # Report filters are optional ("param IS NULL OR ..."); a cached generic plan
+        # must cover every case and cannot use a filter to narrow the scan
+        "plan_cache_mode": "force_custom_plan",
+    },
+}
+
+# Settings applied to every new server connection with set_config().
+SESSION_SETTINGS = (
+    "application_name",
+    "statement_timeout",
+    "lock_timeout",
+    "work_mem",
+    "maintenance_work_mem",
+    "synchronous_commit",
+    "plan_cache_mode",
+)
+
+def _parse_setting(key: str, value: str):
+    """
+    Convert a setting read from the config file or environment to the type of its default.
+
+    Args:
+        key (str): Setting name.
+        value (str): Raw string value. Empty or "none" unsets the setting.
+
+    Returns:
+        The converted value, or None.
+    """
+    if value.strip().lower() in ("", "none"):
+        return None
+    if key == "pool_pre_ping":
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    if key in ("pool_size", "max_overflow", "pool_recycle", "insert_page_size"):
+        return int(value)
+    if key == "pool_timeout":
+        return float(value)
+    return value.strip()
+
+def get_engine_profile(name: str = "default"):
+    """
+    Resolve the engine settings for a profile.
+
+    Later sources override earlier ones: ENGINE_DEFAULTS, the built-in profile,
+    the [engine] and [engine:<name>] sections of CONFIG_FILE, then the
+    DB_<SETTING> and DB_<NAME>_<SETTING> environment variables
+    (e.g. DB_POOL_SIZE, DB_BULK_WORK_MEM).
+
+    Args:
+        name (str): Profile name (default: "default").
+
+    Returns:
+        dict: The effective settings for the profile.
+
+    Raises:
+        ValueError: If the profile is neither built in nor defined in CONFIG_FILE.
+    """
+    import configparser
+
+    parser = configparser.ConfigParser()
+    if CONFIG_FILE:
+        parser.read(CONFIG_FILE)
+    section = f"engine:{name}"
+    if name not in ENGINE_PROFILES and not parser.has_section(section):
+        raise ValueError(f"Unknown engine profile '{name}'.")
+
+    settings = dict(ENGINE_DEFAULTS)
+    settings.update(ENGINE_PROFILES.get(name, {}))
+    for section_name in ("engine", section):
+        if parser.has_section(section_name):
+            for key, value in parser.items(section_name):
+                if key in ENGINE_DEFAULTS:
+                    settings[key] = _parse_setting(key, value)
+    for prefix in ("DB_", f"DB_{name.upper()}_"):
+        for key in ENGINE_DEFAULTS:
+            value = os.getenv(prefix + key.upper())
+            if value is not None:
+                settings[key] = _parse_setting(key, value)
+    return settings
@@ -1,35 +1,193 @@
-import os
-from sqlalchemy import create_engine
+import threading
+import time
+import sqlalchemy
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.orm import sessionmaker
-from .config import DEFAULT_DATA_DIR, DATABASE_URL
+from sqlalchemy.pool import QueuePool
+from . import config
+from .config import DATABASE_URL, SESSION_SETTINGS
 
-_engine = None  # Global engine instance
+_engine = None  # Global engine instance for the default profile
+_engines = {}  # Engine instances for the other profiles, keyed by profile name
+_session_factories = {}  # {profile: (engine, sessionmaker)}
 
-def get_engine():
+class InstrumentedQueuePool(QueuePool):
     """
-    Return a global SQLAlchemy engine using the DATABASE_URL from config.
+    QueuePool that records how many checkouts happened and how long they waited for a connection.
+
+    Time spent opening a new connection during a checkout is recorded separately
+    as connect time, so the checkout wait only reflects contention for the pool.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self._checkout_state = threading.local()  # Connect time spent inside the current _do_get()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.connects = 0
+        self.connect_total = 0.0
+        self.connect_max = 0.0
+
+    def _create_connection(self):
+        start = time.perf_counter()
+        try:
+            return super()._create_connection()
+        finally:
+            elapsed = time.perf_counter() - start
+            self._checkout_state.connect_time = getattr(self._checkout_state, "connect_time", 0.0) + elapsed
+            with self._stats_lock:
+                self.connects += 1
+                self.connect_total += elapsed
+                self.connect_max = max(self.connect_max, elapsed)
+
+    def _do_get(self):
+        self._checkout_state.connect_time = 0.0
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = max(time.perf_counter() - start - self._checkout_state.connect_time, 0.0)
+            with self._stats_lock:
+                self.checkouts += 1
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+
+def _build_engine(profile: str):
+    """
+    Create an engine for a profile using the settings from config.get_engine_profile().
+
+    Args:
+        profile (str): Engine profile name.
+
+    Returns:
+        Engine: The new SQLAlchemy engine.
+    """
+    settings = config.get_engine_profile(profile)
+    url = make_url(DATABASE_URL)
+    kwargs = {
+        "echo": False,
+        "future": True,
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings["pool_size"],
+        "max_overflow": settings["max_overflow"],
+        "pool_timeout": settings["pool_timeout"],
+        "pool_recycle": settings["pool_recycle"],
+        "pool_pre_ping": settings["pool_pre_ping"],
+    }
+    is_psycopg2 = url.get_backend_name() == "postgresql" and url.get_driver_name() == "psycopg2"
+    if settings["executemany_mode"] and is_psycopg2:
+        kwargs["executemany_mode"] = settings["executemany_mode"]
+    if settings["insert_page_size"]:
+        # SQLAlchemy 2.x batches INSERTs with "insertmanyvalues"; 1.4 uses psycopg2's execute_values
+        if int(sqlalchemy.__version__.split(".")[0]) >= 2:
+            kwargs["insertmanyvalues_page_size"] = settings["insert_page_size"]
+        elif is_psycopg2:
+            kwargs["executemany_values_page_size"] = settings["insert_page_size"]
+
+    engine = create_engine(url, **kwargs)
+
+    session_settings = {
+        name: str(settings[name]) for name in SESSION_SETTINGS if settings.get(name) is not None
+    }
+    if session_settings and url.get_backend_name() == "postgresql":
+        @event.listens_for(engine, "connect")
+        def apply_session_settings(dbapi_connection, connection_record):
+            # Applied once per server connection, then reused by every checkout
+            cursor = dbapi_connection.cursor()
+            for name, value in session_settings.items():
+                cursor.execute("SELECT set_config(%s, %s, false)", (name, value))
+            cursor.close()
+            dbapi_connection.commit()  # Keep the settings from being rolled back with the transaction
+
+    return engine
+
+def get_engine(profile: str = "default"):
+    """
+    Return the global SQLAlchemy engine for a profile using the DATABASE_URL from config.
+
+    Engines are created once per profile and reused, so each profile keeps its own
+    connection pool. See config.get_engine_profile() for the available settings.
+
+    Args:
+        profile (str): Engine profile name, e.g. "default", "bulk" or "analytics" (default: "default").
 
     Returns:
         Engine: The SQLAlchemy engine instance for database connections.
 
     Raises:
         RuntimeError: If the DATABASE_URL is not set.
+        ValueError: If the profile is unknown.
     """
     global _engine
-    if _engine is not None:
+    if profile == "default" and _engine is not None:
         return _engine
+    if profile != "default" and profile in _engines:
+        return _engines[profile]
     if not DATABASE_URL:
         raise RuntimeError("DATABASE_URL environment variable is not set.")
-    _engine = create_engine(DATABASE_URL, echo=False, future=True)
-    return _engine
+    engine = _build_engine(profile)
+    if profile == "default":
+        _engine = engine
+    else:
+        _engines[profile] = engine
+    return engine
 
-def get_session():
+def get_session(profile: str = "default"):
     """
     Create and return a new SQLAlchemy session using the engine from get_engine().
 
+    The session factory is built once per profile and engine.
+
+    Args:
+        profile (str): Engine profile name (default: "default").
+
     Returns:
         Session: A new SQLAlchemy session object for database operations.
     """
-    engine = get_engine()
-    SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
-    return SessionLocal()
+    engine = get_engine(profile)
+    cached = _session_factories.get(profile)
+    if cached is None or cached[0] is not engine:
+        factory = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+        cached = _session_factories[profile] = (engine, factory)
+    return cached[1]()
+
+def get_pool_stats(engine):
+    """
+    Return connection pool statistics for an engine.
+
+    Args:
+        engine: SQLAlchemy engine instance.
+
+    Returns:
+        dict: Pool size, checked in/out and overflow connections, plus checkout count,
+        total/maximum checkout wait in seconds, timeouts and the count and total/maximum
+        time of new connections when the pool is instrumented.
+    """
+    pool = engine.pool
+    stats = {
+        "size": pool.size() if hasattr(pool, "size") else None,
+        "checked_in": pool.checkedin() if hasattr(pool, "checkedin") else None,
+        "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+        "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+    }
+    if isinstance(pool, InstrumentedQueuePool):
+        with pool._stats_lock:
+            stats.update({
+                "checkouts": pool.checkouts,
+                "wait_total_s": round(pool.wait_total, 6),
+                "wait_max_s": round(pool.wait_max, 6),
+                "timeouts": pool.timeouts,
+                "connects": pool.connects,
+                "connect_total_s": round(pool.connect_total, 6),
+                "connect_max_s": round(pool.connect_max, 6),
+            })
+    return stats
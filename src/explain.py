@@ -0,0 +1,195 @@
+import json
+import os
+from datetime import datetime, timezone
+from .config import DEFAULT_PLAN_DIR
+from .db import get_session
+from .queries import REPORTS, execute_prepared, get_report
+
+EXPLAIN_PREFIX = "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) "
+
+def explain_report(session, report, values: dict):
+    """
+    Run a report's prepared statement under EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) and return the plan output.
+
+    The query is executed, so the caller's transaction should be rolled back afterwards.
+
+    Args:
+        session: SQLAlchemy session connected to PostgreSQL.
+        report: The queries.Report to explain.
+        values (dict): Parameter values, as returned by Report.bind().
+
+    Returns:
+        dict: The top-level plan object, with "Plan", "Planning Time" and "Execution Time".
+    """
+    result = execute_prepared(session, report, values, prefix=EXPLAIN_PREFIX).scalar_one()
+    if isinstance(result, str):
+        result = json.loads(result)
+    return result[0]
+
+def capture_plans(names=None, plan_dir: str = DEFAULT_PLAN_DIR, params: dict = None):
+    """
+    Capture and save the execution plans of registered reports.
+
+    Each plan is written to <plan_dir>/<report name>.json.
+
+    Args:
+        names (list, optional): Report names to capture (default: all registered reports).
+        plan_dir (str): Directory to save plans in (default: DEFAULT_PLAN_DIR).
+        params (dict, optional): Parameter values; each report uses the ones it declares.
+
+    Returns:
+        dict: {report_name: plan record, ...}
+
+    Raises:
+        KeyError: If a name is not a registered report.
+    """
+    reports = [get_report(name) for name in (names or REPORTS)]
+    params = params or {}
+    os.makedirs(plan_dir, exist_ok=True)
+
+    records = {}
+    for report in reports:
+        values = report.bind({key: value for key, value in params.items() if key in report.param_names})
+        # EXPLAIN ANALYZE executes the query; the session rolls back on close
+        with get_session("analytics") as session:
+            output = explain_report(session, report, values)
+        record = {
+            "query": report.name,
+            "params": values,
+            "captured_at": datetime.now(timezone.utc).isoformat(),
+            "planning_time_ms": output.get("Planning Time"),
+            "execution_time_ms": output.get("Execution Time"),
+            "plan": output["Plan"],
+        }
+        with open(os.path.join(plan_dir, f"{report.name}.json"), "w") as f:
+            json.dump(record, f, indent=2, default=str)
+        records[report.name] = record
+    return records
+
+def load_plans(plan_dir: str):
+    """
+    Load saved plan records from a directory.
+
+    Args:
+        plan_dir (str): Directory containing <query name>.json plan files.
+
+    Returns:
+        dict: {query_name: plan record, ...}
+    """
+    records = {}
+    for file in sorted(os.listdir(plan_dir)):
+        if file.endswith(".json"):
+            with open(os.path.join(plan_dir, file)) as f:
+                record = json.load(f)
+            records[record.get("query", os.path.splitext(file)[0])] = record
+    return records
+
+def _iter_nodes(node):
+    """
+    Yield a plan node and all of its descendants.
+    """
+    yield node
+    for child in node.get("Plans", []):
+        yield from _iter_nodes(child)
+
+def summarize_plan(record: dict):
+    """
+    Extract the plan features used for regression checks.
+
+    Args:
+        record (dict): A plan record as saved by capture_plans().
+
+    Returns:
+        dict: {"seq_scans": set of relation names scanned sequentially,
+               "worst_estimate": largest ratio between actual and estimated rows (>= 1),
+               "worst_estimate_node": description of the node with that ratio,
+               "execution_time_ms": execution time}
+    """
+    seq_scans = set()
+    worst_estimate, worst_node = 1.0, None
+    for node in _iter_nodes(record["plan"]):
+        if node.get("Node Type") == "Seq Scan":
+            seq_scans.add(node.get("Relation Name"))
+        if "Actual Rows" in node and "Plan Rows" in node and node.get("Actual Loops", 1) > 0:
+            actual = max(node["Actual Rows"], 1)
+            planned = max(node["Plan Rows"], 1)
+            ratio = max(actual / planned, planned / actual)
+            if ratio > worst_estimate:
+                worst_estimate = ratio
+                worst_node = f'{node["Node Type"]} on {node["Relation Name"]}' if "Relation Name" in node else node["Node Type"]
+    return {
+        "seq_scans": seq_scans,
+        "worst_estimate": worst_estimate,
+        "worst_estimate_node": worst_node,
+        "execution_time_ms": record.get("execution_time_ms") or 0.0,
+    }
+
+def compare_plans(
+    name: str,
+    baseline: dict,
+    current: dict,
+    runtime_threshold: float = 0.5,
+    min_runtime_ms: float = 1.0,
+    estimate_threshold: float = 10.0,
+):
+    """
+    Compare a captured plan against its baseline and describe any regressions.
+
+    Flags sequential scans on relations that the baseline did not scan sequentially,
+    row misestimates that exceed estimate_threshold and are worse than the baseline's,
+    and execution time growth above runtime_threshold (as a fraction of the baseline)
+    when the absolute growth is at least min_runtime_ms.
+
+    Args:
+        name (str): Query name, used in the messages.
+        baseline (dict): Baseline plan record.
+        current (dict): Current plan record.
+        runtime_threshold (float): Allowed relative runtime growth (default: 0.5, i.e. 50%).
+        min_runtime_ms (float): Ignore runtime growth smaller than this (default: 1.0).
+        estimate_threshold (float): Allowed actual/estimated row ratio (default: 10.0).
+
+    Returns:
+        list: Regression messages; empty if none were found.
+    """
+    base = summarize_plan(baseline)
+    cur = summarize_plan(current)
+    regressions = []
+
+    for relation in sorted(cur["seq_scans"] - base["seq_scans"]):
+        regressions.append(f"{name}: new sequential scan on {relation}")
+
+    if cur["worst_estimate"] > estimate_threshold and cur["worst_estimate"] > base["worst_estimate"]:
+        regressions.append(
+            f"{name}: row estimate off by {cur['worst_estimate']:.1f}x at {cur['worst_estimate_node']} "
+            f"(baseline {base['worst_estimate']:.1f}x)"
+        )
+
+    base_ms, cur_ms = base["execution_time_ms"], cur["execution_time_ms"]
+    if cur_ms > base_ms * (1 + runtime_threshold) and cur_ms - base_ms >= min_runtime_ms:
+        regressions.append(f"{name}: execution time {cur_ms:.2f} ms vs baseline {base_ms:.2f} ms")
+
+    return regressions
+
+def check_plans(baseline_dir: str, current_dir: str = DEFAULT_PLAN_DIR, **thresholds):
+    """
+    Compare every baseline plan with the plan of the same name in current_dir.
+
+    Baselines without a current plan are reported as missing.
+
+    Args:
+        baseline_dir (str): Directory with baseline plan files.
+        current_dir (str): Directory with freshly captured plan files (default: DEFAULT_PLAN_DIR).
+        **thresholds: Passed to compare_plans().
+
+    Returns:
+        list: Regression messages; empty if none were found.
+    """
+    baselines = load_plans(baseline_dir)
+    current = load_plans(current_dir)
+    regressions = []
+    for name, baseline in baselines.items():
+        if name not in current:
+            regressions.append(f"{name}: no current plan captured")
+            continue
+        regressions.extend(compare_plans(name, baseline, current[name], **thresholds))
+    return regressions
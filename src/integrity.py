@@ -0,0 +1,205 @@
+from collections import namedtuple
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from .config import DEFAULT_SCHEMA_FILE
+from .schema_cache import load_schema
+
+# Result of an orphan check: total orphan rows, distinct orphan keys, and up to
+# sample_size (key, row count) pairs for the keys with the most orphan rows.
+OrphanReport = namedtuple("OrphanReport", ["relationship", "orphan_rows", "orphan_keys", "samples"])
+
+# Anti-join from the referencing table to the referenced table. PostgreSQL runs
+# NOT EXISTS as a single hash or merge anti join over both tables, so the cost is
+# one pass over each table rather than a lookup per row. The window aggregates
+# are computed before LIMIT, so the totals cover every orphan key.
+ORPHANS_SQL = """
+        WITH orphans AS (
+            SELECT c."{column}" AS key, COUNT(*) AS row_count
+            FROM "{table}" c
+            WHERE c."{column}" IS NOT NULL
+              AND NOT EXISTS (
+                  SELECT 1 FROM "{ref_table}" p WHERE p."{ref_column}" = c."{column}"
+              )
+            GROUP BY c."{column}"
+        )
+        SELECT key, row_count, SUM(row_count) OVER () AS orphan_rows, COUNT(*) OVER () AS orphan_keys
+        FROM orphans
+        ORDER BY row_count DESC, key
+        LIMIT :limit;
+    """
+
+CONSTRAINT_EXISTS_SQL = """
+        SELECT convalidated FROM pg_constraint
+        WHERE conname = :name AND conrelid = to_regclass(:table);
+    """
+
+# A valid, non-partial unique index on exactly this column, such as the index behind a
+# primary key or unique constraint of any name, is enough for a foreign key to reference.
+UNIQUE_INDEX_EXISTS_SQL = """
+        SELECT EXISTS (
+            SELECT 1
+            FROM pg_index i
+            JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0]
+            WHERE i.indrelid = to_regclass(:table)
+              AND a.attname = :column
+              AND i.indisunique AND i.indisvalid AND i.indimmediate
+              AND i.indnkeyatts = 1
+              AND i.indpred IS NULL AND i.indexprs IS NULL
+        );
+    """
+
+def describe(relationship):
+    """
+    Return a short label for a relationship, e.g. "TRANSACTIONS.ACCOUNT_GUID -> ACCOUNTS.ACCOUNT_GUID".
+    """
+    return f"{relationship.table}.{relationship.column} -> {relationship.ref_table}.{relationship.ref_column}"
+
+def foreign_key_name(relationship):
+    """
+    Return the name of the foreign key constraint for a relationship.
+    """
+    return f"{relationship.table}_{relationship.column}_fkey"
+
+def unique_key_name(relationship):
+    """
+    Return the name of the unique constraint on the referenced column of a relationship.
+    """
+    return f"{relationship.ref_table}_{relationship.ref_column}_key"
+
+def find_orphans(conn, relationship, sample_size: int = 5):
+    """
+    Find rows whose key does not exist in the referenced table.
+
+    NULL keys are not orphans, as with a foreign key constraint.
+
+    Args:
+        conn: SQLAlchemy connection.
+        relationship (Relationship): The relationship to check.
+        sample_size (int): Maximum number of orphan keys to return as samples (default: 5).
+
+    Returns:
+        OrphanReport: Orphan row and key counts with sample keys.
+    """
+    sql = ORPHANS_SQL.format(**relationship._asdict())
+    # Fetch at least one row so the totals are returned even when no samples are wanted
+    rows = conn.execute(text(sql), {"limit": max(sample_size, 1)}).fetchall()
+    if not rows:
+        return OrphanReport(relationship, 0, 0, [])
+    samples = [(row._mapping["key"], row._mapping["row_count"]) for row in rows[:sample_size]]
+    totals = rows[0]._mapping
+    return OrphanReport(relationship, int(totals["orphan_rows"]), totals["orphan_keys"], samples)
+
+def check_integrity(engine, schema_file: str = DEFAULT_SCHEMA_FILE, sample_size: int = 5):
+    """
+    Check every relationship declared in the schema file for orphan rows.
+
+    Args:
+        engine: SQLAlchemy engine instance connected to the target database.
+        schema_file (str): Path to the schema CSV file (default: DEFAULT_SCHEMA_FILE).
+        sample_size (int): Maximum number of orphan keys reported per relationship (default: 5).
+
+    Returns:
+        list: An OrphanReport for each declared relationship, in schema order.
+    """
+    relationships = load_schema(schema_file).relationships
+    with engine.connect() as conn:
+        return [find_orphans(conn, relationship, sample_size) for relationship in relationships]
+
+def _constraint_state(conn, table_name: str, name: str):
+    """
+    Return None if a constraint does not exist, otherwise whether it has been validated.
+    """
+    return conn.execute(text(CONSTRAINT_EXISTS_SQL), {"name": name, "table": f'"{table_name}"'}).scalar()
+
+def _add_unique_key(engine, relationship):
+    """
+    Add a unique constraint on the referenced column of a relationship, unless the
+    column already has a primary key, unique constraint or unique index.
+
+    Returns:
+        bool: False if the column has duplicate values.
+    """
+    ukey = unique_key_name(relationship)
+    with engine.connect() as conn:
+        exists = conn.execute(
+            text(UNIQUE_INDEX_EXISTS_SQL),
+            {"table": f'"{relationship.ref_table}"', "column": relationship.ref_column},
+        ).scalar()
+    if exists:
+        return True
+
+    # CONCURRENTLY cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        # A failed concurrent build leaves an invalid index behind; remove it before retrying
+        conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{ukey}"'))
+        try:
+            conn.execute(text(
+                f'CREATE UNIQUE INDEX CONCURRENTLY "{ukey}" ON "{relationship.ref_table}" ("{relationship.ref_column}")'
+            ))
+        except IntegrityError:
+            conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{ukey}"'))
+            return False
+        conn.execute(text(f'ALTER TABLE "{relationship.ref_table}" ADD CONSTRAINT "{ukey}" UNIQUE USING INDEX "{ukey}"'))
+    return True
+
+def add_foreign_keys(engine, relationships):
+    """
+    Add foreign key constraints for relationships, without holding long locks.
+
+    The referenced column first gets a unique constraint if it has no unique key of
+    any name, since PostgreSQL requires one. Its index is built with CREATE UNIQUE INDEX CONCURRENTLY,
+    which allows reads and writes during the build, and then attached with
+    ADD CONSTRAINT ... UNIQUE USING INDEX, which only needs a brief exclusive lock.
+    Each foreign key is then added as NOT VALID, which only checks rows written
+    afterwards and takes a brief lock, and is validated separately. VALIDATE
+    CONSTRAINT checks the existing rows in one scan while allowing concurrent reads
+    and writes. A constraint that fails validation is dropped again.
+
+    Args:
+        engine: SQLAlchemy engine instance connected to the target database.
+        relationships (iterable): Relationship definitions.
+
+    Returns:
+        dict: {relationship: status message, ...}
+    """
+    results = {}
+    for rel in relationships:
+        fkey = foreign_key_name(rel)
+        if not _add_unique_key(engine, rel):
+            results[rel] = f"not added: {rel.ref_table}.{rel.ref_column} has duplicate values"
+            continue
+
+        with engine.begin() as conn:
+            validated = _constraint_state(conn, rel.table, fkey)
+            if validated is None:
+                conn.execute(text(
+                    f'ALTER TABLE "{rel.table}" ADD CONSTRAINT "{fkey}" FOREIGN KEY ("{rel.column}") '
+                    f'REFERENCES "{rel.ref_table}" ("{rel.ref_column}") NOT VALID'
+                ))
+        if validated:
+            results[rel] = f"{fkey} already validated"
+            continue
+
+        try:
+            with engine.begin() as conn:
+                conn.execute(text(f'ALTER TABLE "{rel.table}" VALIDATE CONSTRAINT "{fkey}"'))
+            results[rel] = f"{fkey} added and validated"
+        except IntegrityError:
+            with engine.begin() as conn:
+                conn.execute(text(f'ALTER TABLE "{rel.table}" DROP CONSTRAINT IF EXISTS "{fkey}"'))
+            results[rel] = f"not added: {rel.table}.{rel.column} has orphan rows"
+    return results
+
+def drop_foreign_keys(conn, relationships):
+    """
+    Drop the foreign key constraints added by add_foreign_keys(), if present.
+
+    Args:
+        conn: SQLAlchemy connection inside a transaction.
+        relationships (iterable): Relationship definitions.
+
+    Returns:
+        None
+    """
+    for rel in relationships:
+        conn.execute(text(f'ALTER TABLE IF EXISTS "{rel.table}" DROP CONSTRAINT IF EXISTS "{foreign_key_name(rel)}"'))
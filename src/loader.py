@@ -1,8 +1,21 @@
+import io
 import os
+import re
+import numpy as np
 import pandas as pd
 from sqlalchemy import text
-from .config import DEFAULT_DATA_DIR, DEFAULT_SCHEMA_FILE
-from .schema_builder import get_schema_columns
+from .config import DEFAULT_DATA_DIR, DEFAULT_SCHEMA_FILE, LOAD_CHUNK_SIZE
+from .schema_cache import load_schema
+
+# Scaled NUMERIC values with up to this many digits always fit in int64.
+_MAX_SCALED_DIGITS = 18
+
+# Sign, integer digits and fraction digits of a plain decimal such as "-123.45" or ".5".
+_DECIMAL_PATTERN = r"^\s*([+-]?)(\d*)(?:\.(\d*))?\s*$"
+
+# Written for missing values in COPY data. An unquoted \N is NULL, while pandas writes
+# a missing value in a one-column row as "", which COPY reads as an empty string.
+COPY_NULL = r"\N"
 
 def validate_csv_columns(table_name, df, schema):
     """
@@ -33,45 +46,237 @@ def validate_csv_columns(table_name, df, schema):
     # Only fail if required columns are missing
     return not missing
 
-def load_csv(engine, table_name, file_path, schema=None):
+def align_columns(df, expected_cols):
+    """
+    Return the DataFrame with columns in schema order, adding missing columns as NaN.
+
+    Args:
+        df (pd.DataFrame): DataFrame loaded from the CSV file.
+        expected_cols (list): Column names in schema order.
+
+    Returns:
+        pd.DataFrame: The reordered DataFrame.
+    """
+    for col in expected_cols:
+        if col not in df.columns:
+            df[col] = pd.NA
+    return df[expected_cols]  # Reorder columns
+
+def conform_to_schema(table_name, df, schema):
+    """
+    Validate a DataFrame against the schema and return it with columns in schema order.
+
+    Args:
+        table_name (str): Name of the table being loaded.
+        df (pd.DataFrame): DataFrame loaded from the CSV file.
+        schema (dict): Mapping of table names to expected column lists.
+
+    Returns:
+        pd.DataFrame or None: The reordered DataFrame, or None if validation fails.
+    """
+    # Validate columns before loading
+    if not validate_csv_columns(table_name, df, schema):
+        return None
+    return align_columns(df, schema.get(table_name))
+
+def numeric_scale(data_type: str):
+    """
+    Return the scale of a NUMERIC(precision, scale) data type, or None for other types.
+    """
+    match = re.search(r"numeric\(\s*\d+\s*,\s*(\d+)\s*\)", data_type.lower())
+    return int(match.group(1)) if match else None
+
+def compact_dtypes(column_types):
+    """
+    Choose compact read_csv dtypes for the columns of a table.
+
+    Key columns (names ending in _GUID) and DATE columns repeat heavily, so they are
+    dictionary-encoded as categoricals: each distinct value is stored once and rows hold
+    small integer codes. NUMERIC columns are read as text, never as float, and
+    NUMERIC(p,s) columns are then converted to scaled int64 by to_scaled_int(). Other
+    columns keep pandas' default inference.
+
+    Args:
+        column_types (dict): {column_name: schema data type, ...}
+
+    Returns:
+        dict: dtype mapping for pd.read_csv.
+    """
+    dtypes = {}
+    for col, data_type in column_types.items():
+        if data_type.lower().strip().startswith("numeric"):
+            dtypes[col] = "str"
+        elif col.upper().endswith("_GUID") or data_type.lower() == "date":
+            dtypes[col] = "category"
+    return dtypes
+
+def to_scaled_int(series, scale: int):
+    """
+    Convert a NUMERIC column read as text to nullable int64 holding value * 10**scale.
+
+    The integer and fraction digits are combined as text, so the conversion is exact.
+    If any value is not a plain decimal (e.g. uses an exponent), has more significant
+    decimal places than the scale, or does not fit in _MAX_SCALED_DIGITS digits, the
+    column is returned unchanged and PostgreSQL parses and rounds the text itself.
+
+    Args:
+        series (pd.Series): Column of decimal strings.
+        scale (int): Number of decimal places.
+
+    Returns:
+        pd.Series: Int64 column of scaled values, or the original column.
+    """
+    missing = series.isna().to_numpy()
+    parts = series[~missing].str.extract(_DECIMAL_PATTERN)
+    if parts[1].isna().any() or ((parts[1] == "") & parts[2].fillna("").eq("")).any():
+        return series  # Not a plain decimal, or no digits at all
+    sign, whole = parts[0], parts[1].str.lstrip("0")
+    frac = parts[2].fillna("").str.rstrip("0")
+    if (frac.str.len() > scale).any() or (whole.str.len() + scale > _MAX_SCALED_DIGITS).any():
+        return series
+    digits = (whole + frac.str.pad(scale, side="right", fillchar="0")).replace("", "0")
+    scaled = np.zeros(len(series), dtype="int64")
+    scaled[~missing] = np.where(sign.to_numpy() == "-", -1, 1) * digits.astype("int64").to_numpy()
+    return pd.Series(pd.arrays.IntegerArray(scaled, missing), index=series.index, name=series.name)
+
+def format_scaled_int(series, scale: int):
+    """
+    Format a scaled Int64 column as decimal text, e.g. -12345 with scale 2 becomes "-123.45".
+
+    Args:
+        series (pd.Series): Int64 column of scaled values.
+        scale (int): Number of decimal places.
+
+    Returns:
+        np.ndarray: Decimal strings, None for missing values.
+    """
+    values = series.to_numpy(dtype="int64", na_value=0)
+    whole, frac = np.divmod(np.abs(values), 10 ** scale)
+    text_values = np.char.add(np.where(values < 0, "-", ""), whole.astype(str))
+    if scale:
+        text_values = np.char.add(np.char.add(text_values, "."), np.char.zfill(frac.astype(str), scale))
+    return np.where(series.isna().to_numpy(), None, text_values.astype(object))
+
+def read_csv_compact(source, column_types=None, chunksize: int = LOAD_CHUNK_SIZE, **kwargs):
+    """
+    Read a CSV file in chunks using compact in-memory column types.
+
+    Args:
+        source: Path or file-like object to read.
+        column_types (dict, optional): {column_name: schema data type, ...}
+        chunksize (int): Rows per chunk (default: LOAD_CHUNK_SIZE).
+        **kwargs: Passed to pd.read_csv (e.g. usecols, header, names).
+
+    Returns:
+        Iterator of pd.DataFrame chunks.
+    """
+    column_types = column_types or {}
+    scales = {col: numeric_scale(data_type) for col, data_type in column_types.items()}
+    reader = pd.read_csv(
+        source,
+        dtype=compact_dtypes(column_types),
+        float_precision="round_trip",
+        chunksize=chunksize,
+        **kwargs,
+    )
+    for chunk in reader:
+        for col in chunk.columns:
+            if scales.get(col) is not None:
+                chunk[col] = to_scaled_int(chunk[col], scales[col])
+        yield chunk
+
+def copy_frame(conn, table_name, df, column_types=None):
+    """
+    Write a DataFrame chunk to a table with PostgreSQL COPY, falling back to INSERTs.
+
+    The chunk is serialized once to CSV text and streamed to the server, so no
+    per-row parameter tuples are built. Scaled NUMERIC columns are formatted back to
+    decimal text straight from their int64 buffers.
+
+    Args:
+        conn: SQLAlchemy connection inside a transaction.
+        table_name (str): Name of the table to insert data into.
+        df (pd.DataFrame): The chunk to write, with columns matching the table.
+        column_types (dict, optional): {column_name: schema data type, ...}
+
+    Returns:
+        int: Number of rows written.
+    """
+    if df.empty:
+        return 0
+    column_types = column_types or {}
+    out = df
+    for col in df.columns:
+        scale = numeric_scale(column_types.get(col, ""))
+        if scale is not None and isinstance(df[col].dtype, pd.Int64Dtype):
+            if out is df:
+                out = df.copy(deep=False)
+            out[col] = format_scaled_int(df[col], scale)
+
+    cursor = conn.connection.cursor()
+    if not hasattr(cursor, "copy_expert"):
+        # Not psycopg2: use regular multi-row INSERTs
+        out.to_sql(table_name, conn, if_exists="append", index=False)
+        return len(out)
+
+    buffer = io.StringIO()
+    out.to_csv(buffer, header=False, index=False, na_rep=COPY_NULL)
+    buffer.seek(0)
+    columns = ", ".join(f'"{col}"' for col in out.columns)
+    cursor.copy_expert(
+        f"COPY \"{table_name}\" ({columns}) FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')", buffer
+    )
+    return len(out)
+
+def load_csv(engine, table_name, file_path, schema=None, column_types=None, chunksize: int = LOAD_CHUNK_SIZE):
     """
     Load a single CSV file into a specified database table, with schema validation.
 
+    The file is read in chunks with compact column types, and each chunk is written
+    with COPY. All chunks are written in one transaction.
+
     Args:
         engine: SQLAlchemy engine instance connected to the target database.
         table_name (str): Name of the table to insert data into.
         file_path (str): Path to the CSV file to be loaded.
         schema (dict, optional): Schema definition for validation (default: None).
+        column_types (dict, optional): {column_name: schema data type, ...} for compact parsing.
+        chunksize (int): Rows read and written per chunk (default: LOAD_CHUNK_SIZE).
 
     Returns:
         None
     """
-    df = pd.read_csv(file_path)  # Read the CSV file into a DataFrame
+    header = pd.read_csv(file_path, nrows=0)  # Read only the header for validation
+    read_kwargs = {}
+    expected_cols = None
     if schema is not None:
         # Validate columns before loading
-        if not validate_csv_columns(table_name, df, schema):
+        if not validate_csv_columns(table_name, header, schema):
             print(f"Skipping {file_path} due to schema mismatch.\n")
             return
-        # Reorder and add missing columns as NaN
         expected_cols = schema.get(table_name)
-        for col in expected_cols:
-            if col not in df.columns:
-                df[col] = pd.NA
-        df = df[expected_cols]  # Reorder columns
-    # Insert the DataFrame into the specified table, appending rows
-    df.to_sql(table_name, engine, if_exists="append", index=False)
-    print(f"Inserted {len(df)} rows into {table_name}")
+        # Extra columns are never parsed
+        read_kwargs["usecols"] = [col for col in header.columns if col in expected_cols]
+
+    inserted = 0
+    with engine.begin() as conn:
+        for chunk in read_csv_compact(file_path, column_types, chunksize, **read_kwargs):
+            if expected_cols is not None:
+                chunk = align_columns(chunk, expected_cols)  # Reorder and add missing columns
+            # Insert the chunk into the specified table, appending rows
+            inserted += copy_frame(conn, table_name, chunk, column_types)
+    print(f"Inserted {inserted} rows into {table_name}")
 
     # Verify insertion by counting rows in the database
     with engine.connect() as conn:
         result = conn.execute(text(f'SELECT COUNT(*) FROM "{table_name}"'))
         db_count = result.scalar()
 
-    if db_count >= len(df):
-        print(f"Verification: {db_count} total rows in '{table_name}' after insert (expected at least {len(df)}).\n")
-    
+    if db_count >= inserted:
+        print(f"Verification: {db_count} total rows in '{table_name}' after insert (expected at least {inserted}).\n")
+
     else:
-        print(f"Warning: Only {db_count} rows in '{table_name}' after insert (expected at least {len(df)}).\n")
+        print(f"Warning: Only {db_count} rows in '{table_name}' after insert (expected at least {inserted}).\n")
 
 def load_all(engine, data_dir: str = DEFAULT_DATA_DIR, schema_file: str = DEFAULT_SCHEMA_FILE):
     """
@@ -85,7 +290,8 @@ def load_all(engine, data_dir: str = DEFAULT_DATA_DIR, schema_file: str = DEFAUL
     Returns:
         None
     """
-    schema = get_schema_columns(schema_file)  # Load schema definitions
+    compiled_schema = load_schema(schema_file)
+    schema = compiled_schema.columns()  # Load schema definitions
     # Iterate over all files in the data directory
     for file in os.listdir(data_dir):
         # Only process CSV files, skip the schema definition file
@@ -95,7 +301,7 @@ def load_all(engine, data_dir: str = DEFAULT_DATA_DIR, schema_file: str = DEFAUL
             print("Loading:", table_name, path)
             try:
                 # Attempt to load the CSV into the table with schema validation
-                load_csv(engine, table_name, path, schema)
+                load_csv(engine, table_name, path, schema, compiled_schema.column_types(table_name))
             except Exception as e:
                 # Print error and skip file on failure
-                print(f"Skipping {file}: {e}")
\ No newline at end of file
+                print(f"Skipping {file}: {e}")
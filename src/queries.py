@@ -1,16 +1,186 @@
+import hashlib
+import importlib
+import os
+import re
+from collections import namedtuple
 from sqlalchemy import text
 from .db import get_session
 
-def overdrawn_checking_accounts():
+# A bind parameter of a report: its name, PostgreSQL type and default value.
+ReportParam = namedtuple("ReportParam", ["name", "pg_type", "default"])
+
+MEMBER_GUIDS = ReportParam("member_guids", "text[]", None)  # Only these members (None: all)
+ACCOUNT_GUIDS = ReportParam("account_guids", "text[]", None)  # Only these accounts (None: all)
+AS_OF_DATE = ReportParam("as_of_date", "date", None)  # Only transactions posted on or before this date
+MIN_OVERDRAFT = ReportParam("min_overdraft", "numeric", 0)  # Only overdrafts of at least this amount
+
+# Report names are used on the command line and in messages, so keep them to simple identifiers.
+REPORT_NAME_PATTERN = re.compile(r"[a-z_][a-z0-9_]*")
+
+class Report:
     """
-    Return members with overdrawn checking accounts and their balances.
+    A named report query with its bind parameters and output columns.
+
+    The SQL refers to parameters as :name. Reports run as server-side prepared
+    statements, prepared once per database connection and reused by later calls.
+    """
+
+    def __init__(self, name: str, title: str, sql: str, params=(), columns=(), row_format: str = None):
+        """
+        Args:
+            name (str): Unique report name, used on the command line.
+            title (str): Heading printed above the results.
+            sql (str): The query, with :name placeholders for its parameters.
+            params (iterable): ReportParam definitions, in order.
+            columns (iterable): Output column names.
+            row_format (str, optional): str.format() template for one result row, using column names.
+
+        Raises:
+            ValueError: If the name is not a lowercase identifier.
+        """
+        if not REPORT_NAME_PATTERN.fullmatch(name):
+            raise ValueError(f"Invalid report name '{name}': use lowercase letters, digits and underscores.")
+        self.name = name
+        self.title = title
+        self.sql = sql
+        self.params = list(params)
+        self.columns = list(columns)
+        self.row_format = row_format
+        # A fixed-length name stays under PostgreSQL's 63 character identifier limit,
+        # and changes whenever the name, parameter types or SQL change
+        signature = "\0".join([name, *(param.pg_type for param in self.params), self.prepared_sql()])
+        self.statement_name = f"report_{hashlib.sha1(signature.encode()).hexdigest()[:16]}"
+
+    @property
+    def param_names(self):
+        return [param.name for param in self.params]
+
+    def prepared_sql(self):
+        """
+        Return the query with :name placeholders replaced by PREPARE-style $n positions.
+        """
+        sql = self.sql.strip().rstrip(";")
+        for position, param in enumerate(self.params, start=1):
+            # (?<!:) leaves ::type casts alone
+            sql = re.sub(rf"(?<!:):{param.name}\b", f"${position}", sql)
+        return sql
+
+    def bind(self, values=None):
+        """
+        Return the parameter values for a call, filling in defaults.
+
+        Args:
+            values (dict, optional): {param_name: value, ...}
+
+        Returns:
+            dict: A value for every declared parameter.
+
+        Raises:
+            ValueError: If a value is given for an undeclared parameter.
+        """
+        values = dict(values or {})
+        unknown = sorted(set(values) - set(self.param_names))
+        if unknown:
+            raise ValueError(f"Report '{self.name}' does not accept parameters: {unknown}")
+        return {param.name: values.get(param.name, param.default) for param in self.params}
+
+    def format_row(self, row):
+        """
+        Format one result row for display.
+        """
+        data = row._mapping
+        if self.row_format:
+            return self.row_format.format(**data)
+        return " | ".join(f"{col}: {data[col]}" for col in self.columns)
+
+# Registered reports by name
+REPORTS = {}
+
+def register_report(report: Report):
+    """
+    Add a report to the registry, replacing any report with the same name.
+
+    Args:
+        report (Report): The report to register.
 
     Returns:
-        List of rows, each containing member and account info for overdrawn checking accounts.
+        Report: The registered report.
+    """
+    REPORTS[report.name] = report
+    return report
+
+def get_report(name: str):
+    """
+    Return a registered report by name.
+
+    Raises:
+        KeyError: If no report with that name is registered.
+    """
+    if name not in REPORTS:
+        raise KeyError(f"Unknown report '{name}'. Available reports: {', '.join(REPORTS)}")
+    return REPORTS[name]
+
+def load_report_plugins(modules: str = None):
+    """
+    Import modules that register additional reports.
+
+    Args:
+        modules (str, optional): Comma-separated module names
+            (default: the CSV_LOADER_REPORTS environment variable).
+
+    Returns:
+        None
+    """
+    modules = modules if modules is not None else os.getenv("CSV_LOADER_REPORTS", "")
+    for module in modules.split(","):
+        if module.strip():
+            importlib.import_module(module.strip())
+
+def execute_prepared(session, report: Report, values: dict, prefix: str = ""):
+    """
+    Execute a report as a server-side prepared statement on the session's connection.
+
+    The statement is prepared the first time it runs on a given database connection.
+    Prepared statement names are tracked in Connection.info, which lives exactly as
+    long as the underlying DBAPI connection and its server session.
+
+    Args:
+        session: SQLAlchemy session.
+        report (Report): The report to execute.
+        values (dict): Parameter values, as returned by Report.bind().
+        prefix (str): Text placed before EXECUTE, e.g. an EXPLAIN clause.
+
+    Returns:
+        Result: The SQLAlchemy result.
+    """
+    conn = session.connection()
+    prepared = conn.info.setdefault("prepared_reports", set())
+    if report.statement_name not in prepared:
+        types = f" ({', '.join(param.pg_type for param in report.params)})" if report.params else ""
+        conn.execute(text(f"PREPARE {report.statement_name}{types} AS {report.prepared_sql()}"))
+        prepared.add(report.statement_name)
+    args = f" ({', '.join(f':{name}' for name in report.param_names)})" if report.params else ""
+    return conn.execute(text(f"{prefix}EXECUTE {report.statement_name}{args}"), values)
+
+def run_report(name: str, params: dict = None):
+    """
+    Run a registered report and return its rows.
+
+    Args:
+        name (str): Report name.
+        params (dict, optional): Parameter values; omitted parameters use their defaults.
+
+    Returns:
+        List of rows.
     """
-    # SQL query to find members whose checking account balance is negative
-    query = text("""
-        SELECT 
+    report = get_report(name)
+    values = report.bind(params)
+    with get_session("analytics") as session:
+        return execute_prepared(session, report, values).fetchall()
+
+# SQL query to find members whose checking account balance is negative
+OVERDRAWN_CHECKING_ACCOUNTS_SQL = """
+        SELECT
             m."MEMBER_GUID",
             m."FIRST_NAME",
             m."LAST_NAME",
@@ -20,23 +190,17 @@ def overdrawn_checking_accounts():
         JOIN "ACCOUNTS" a ON c."ACCOUNT_GUID" = a."ACCOUNT_GUID"
         JOIN "MEMBERS" m ON a."MEMBER_GUID" = m."MEMBER_GUID"
         LEFT JOIN "TRANSACTIONS" t ON c."ACCOUNT_GUID" = t."ACCOUNT_GUID"
+            AND (:as_of_date IS NULL OR t."POST_DATE" <= :as_of_date)
+        WHERE (:member_guids IS NULL OR m."MEMBER_GUID" = ANY(:member_guids))
+            AND (:account_guids IS NULL OR c."ACCOUNT_GUID" = ANY(:account_guids))
         GROUP BY m."MEMBER_GUID", m."FIRST_NAME", m."LAST_NAME", c."ACCOUNT_GUID", c."STARTING_BALANCE"
-        HAVING (c."STARTING_BALANCE" + COALESCE(SUM(t."TRANSACTION_AMOUNT"), 0)) < 0;
-    """)
-    # Execute the query and return all results
-    with get_session() as session:
-        return session.execute(query).fetchall()
-
-def overpaid_loans():
+        HAVING (c."STARTING_BALANCE" + COALESCE(SUM(t."TRANSACTION_AMOUNT"), 0)) < 0
+            AND -(c."STARTING_BALANCE" + COALESCE(SUM(t."TRANSACTION_AMOUNT"), 0)) >= COALESCE(:min_overdraft, 0);
     """
-    Return members who have overpaid their loans and the overpaid amount.
 
-    Returns:
-        List of rows, each containing member and account info for overpaid loans.
-    """
-    # SQL query to find members who have paid more than their starting loan debt
-    query = text("""
-        SELECT 
+# SQL query to find members who have paid more than their starting loan debt
+OVERPAID_LOANS_SQL = """
+        SELECT
             m."MEMBER_GUID",
             m."FIRST_NAME",
             m."LAST_NAME",
@@ -46,42 +210,99 @@ def overpaid_loans():
         JOIN "ACCOUNTS" a ON l."ACCOUNT_GUID" = a."ACCOUNT_GUID"
         JOIN "MEMBERS" m ON a."MEMBER_GUID" = m."MEMBER_GUID"
         LEFT JOIN "TRANSACTIONS" t ON l."ACCOUNT_GUID" = t."ACCOUNT_GUID"
+            AND (:as_of_date IS NULL OR t."POST_DATE" <= :as_of_date)
+        WHERE (:member_guids IS NULL OR m."MEMBER_GUID" = ANY(:member_guids))
+            AND (:account_guids IS NULL OR l."ACCOUNT_GUID" = ANY(:account_guids))
         GROUP BY m."MEMBER_GUID", m."FIRST_NAME", m."LAST_NAME", l."ACCOUNT_GUID", l."STARTING_DEBT"
         HAVING COALESCE(SUM(t."TRANSACTION_AMOUNT"), 0) > l."STARTING_DEBT";
-    """)
-    # Execute the query and return all results
-    with get_session() as session:
-        return session.execute(query).fetchall()
-
-def total_assets():
     """
-    Return the total asset size of the institution (checking balances minus remaining loan debt).
 
-    Returns:
-        The total assets as a single numeric value.
-    """
-    # SQL query to calculate total assets: sum of checking balances minus sum of remaining loan debts
-    query = text("""
+# SQL query to calculate total assets: sum of checking balances minus sum of remaining loan debts
+TOTAL_ASSETS_SQL = """
         WITH checking_balances AS (
-            SELECT 
+            SELECT
                 c."ACCOUNT_GUID",
                 (c."STARTING_BALANCE" + COALESCE(SUM(t."TRANSACTION_AMOUNT"), 0)) AS balance
             FROM "CHECKING" c
             LEFT JOIN "TRANSACTIONS" t ON c."ACCOUNT_GUID" = t."ACCOUNT_GUID"
+                AND (:as_of_date IS NULL OR t."POST_DATE" <= :as_of_date)
+            WHERE (:account_guids IS NULL OR c."ACCOUNT_GUID" = ANY(:account_guids))
             GROUP BY c."ACCOUNT_GUID", c."STARTING_BALANCE"
         ),
         loan_balances AS (
-            SELECT 
+            SELECT
                 l."ACCOUNT_GUID",
                 (l."STARTING_DEBT" - COALESCE(SUM(t."TRANSACTION_AMOUNT"), 0)) AS remaining_debt
             FROM "LOANS" l
             LEFT JOIN "TRANSACTIONS" t ON l."ACCOUNT_GUID" = t."ACCOUNT_GUID"
+                AND (:as_of_date IS NULL OR t."POST_DATE" <= :as_of_date)
+            WHERE (:account_guids IS NULL OR l."ACCOUNT_GUID" = ANY(:account_guids))
             GROUP BY l."ACCOUNT_GUID", l."STARTING_DEBT"
         )
-        SELECT 
+        SELECT
             (COALESCE((SELECT SUM(balance) FROM checking_balances), 0) -
              COALESCE((SELECT SUM(remaining_debt) FROM loan_balances), 0)) AS total_assets;
-    """)
-    # Execute the query and return the scalar result (total assets)
-    with get_session() as session:
-        return session.execute(query).scalar_one()
+    """
+
+register_report(Report(
+    "overdrawn_checking_accounts",
+    "Overdrawn Checking Accounts",
+    OVERDRAWN_CHECKING_ACCOUNTS_SQL,
+    params=[MEMBER_GUIDS, ACCOUNT_GUIDS, AS_OF_DATE, MIN_OVERDRAFT],
+    columns=["MEMBER_GUID", "FIRST_NAME", "LAST_NAME", "ACCOUNT_GUID", "balance"],
+    row_format="Member: {FIRST_NAME} {LAST_NAME} | Account: {ACCOUNT_GUID} | Balance: {balance}",
+))
+
+register_report(Report(
+    "overpaid_loans",
+    "Overpaid Loans",
+    OVERPAID_LOANS_SQL,
+    params=[MEMBER_GUIDS, ACCOUNT_GUIDS, AS_OF_DATE],
+    columns=["MEMBER_GUID", "FIRST_NAME", "LAST_NAME", "ACCOUNT_GUID", "overpaid_amount"],
+    row_format="Member: {FIRST_NAME} {LAST_NAME} | Account: {ACCOUNT_GUID} | Overpaid Amount: {overpaid_amount}",
+))
+
+register_report(Report(
+    "total_assets",
+    "Total Assets",
+    TOTAL_ASSETS_SQL,
+    params=[ACCOUNT_GUIDS, AS_OF_DATE],
+    columns=["total_assets"],
+    row_format="{total_assets:,.2f}",
+))
+
+def overdrawn_checking_accounts(**params):
+    """
+    Return members with overdrawn checking accounts and their balances.
+
+    Args:
+        **params: Optional member_guids, account_guids, as_of_date and min_overdraft filters.
+
+    Returns:
+        List of rows, each containing member and account info for overdrawn checking accounts.
+    """
+    return run_report("overdrawn_checking_accounts", params)
+
+def overpaid_loans(**params):
+    """
+    Return members who have overpaid their loans and the overpaid amount.
+
+    Args:
+        **params: Optional member_guids, account_guids and as_of_date filters.
+
+    Returns:
+        List of rows, each containing member and account info for overpaid loans.
+    """
+    return run_report("overpaid_loans", params)
+
+def total_assets(**params):
+    """
+    Return the total asset size of the institution (checking balances minus remaining loan debt).
+
+    Args:
+        **params: Optional account_guids and as_of_date filters.
+
+    Returns:
+        The total assets as a single numeric value.
+    """
+    return run_report("total_assets", params)[0]._mapping["total_assets"]
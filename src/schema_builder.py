@@ -1,9 +1,8 @@
-import os
-import pandas as pd
-from sqlalchemy import create_engine, MetaData, Table, Column, String, Date, DateTime, Text, Numeric
+from sqlalchemy import MetaData, Table, Column, String, Date, DateTime, Text, Numeric
 import re
-from .config import DEFAULT_DATA_DIR, DEFAULT_SCHEMA_FILE
-from sqlalchemy import Numeric
+from .config import DEFAULT_SCHEMA_FILE
+from .integrity import drop_foreign_keys
+from .schema_cache import load_schema
 
 def map_type(dtype: str):
     """
@@ -36,38 +35,45 @@ def map_type(dtype: str):
 
     return Text
 
-def create_tables(schema_file: str = DEFAULT_SCHEMA_FILE, engine=None):
+def create_tables(schema_file: str = DEFAULT_SCHEMA_FILE, engine=None, drop_existing: bool = True):
     """
     Read a schema CSV file and create tables dynamically in the database.
 
     Args:
         schema_file (str): Path to the schema CSV file (default: DEFAULT_SCHEMA_FILE).
         engine: SQLAlchemy engine instance. If None, will attempt to create one.
+        drop_existing (bool): Drop and recreate existing tables (default: True).
+            When False, only tables that do not exist yet are created.
 
     Returns:
         engine: The SQLAlchemy engine used for table creation.
     """
     if not engine:
+        from .db import get_engine
         engine = get_engine()
 
-    # Read the schema CSV into a DataFrame
-    schema = pd.read_csv(schema_file, skipinitialspace=True, engine="python")
+    # Load the compiled schema (cached on disk, keyed by the schema file's hash)
+    schema = load_schema(schema_file)
 
     metadata = MetaData()
 
-    # Group the schema by table name and create each table with its columns
-    for table_name, group in schema.groupby("TABLE_NAME"):
+    # Create each table with its columns
+    for table_name, schema_cols in schema.tables.items():
         cols = []
-        for _, row in group.iterrows():
+        for schema_col in schema_cols:
             # Map the data type and create a SQLAlchemy Column
-            col = Column(row["COLUMN_NAME"], map_type(str(row["DATA_TYPE"])))
+            col = Column(schema_col.name, map_type(schema_col.data_type))
             cols.append(col)
 
         # Define the table with its columns
         Table(table_name, metadata, *cols)
 
     # Drop all existing tables and create new ones as defined in the schema
-    metadata.drop_all(engine)
+    if drop_existing:
+        # Foreign keys added by the integrity check are not part of the metadata
+        with engine.begin() as conn:
+            drop_foreign_keys(conn, schema.relationships)
+        metadata.drop_all(engine)
     metadata.create_all(engine)
     print(f"Created tables from {schema_file}\n")
     return engine
@@ -82,8 +88,4 @@ def get_schema_columns(schema_file: str = DEFAULT_SCHEMA_FILE):
     Returns:
         dict: {table_name: [column1, column2, ...], ...}
     """
-    schema = pd.read_csv(schema_file, skipinitialspace=True, engine="python")
-    schema_dict = {}
-    for table_name, group in schema.groupby("TABLE_NAME"):
-        schema_dict[table_name] = list(group["COLUMN_NAME"])
-    return schema_dict
\ No newline at end of file
+    return load_schema(schema_file).columns()
@@ -0,0 +1,175 @@
+import csv
+import hashlib
+import json
+import os
+from collections import namedtuple
+from .config import DEFAULT_SCHEMA_FILE
+from . import config
+
+# Bump when the cached JSON layout changes so stale cache files are ignored.
+CACHE_FORMAT_VERSION = 2
+
+SchemaColumn = namedtuple("SchemaColumn", ["name", "data_type", "ordinal"])
+
+# A declared reference from table.column to ref_table.ref_column, checked after loading.
+Relationship = namedtuple("Relationship", ["table", "column", "ref_table", "ref_column"])
+
+# In-process cache of compiled schemas keyed by file digest.
+_compiled = {}
+
+class CompiledSchema:
+    """
+    Parsed form of INFORMATION_SCHEMA.csv: tables with their columns, data types and ordinals,
+    and the relationships declared between them.
+
+    Tables are kept in sorted order and columns in file order.
+    """
+
+    def __init__(self, digest: str, tables: dict, relationships=()):
+        """
+        Args:
+            digest (str): SHA-256 hex digest of the schema file contents.
+            tables (dict): {table_name: [SchemaColumn, ...], ...}
+            relationships (iterable): Relationship definitions, in file order.
+        """
+        self.digest = digest
+        self.tables = tables
+        self.relationships = list(relationships)
+
+    def columns(self):
+        """
+        Return a mapping of table names to column names.
+
+        Returns:
+            dict: {table_name: [column1, column2, ...], ...}
+        """
+        return {table: [col.name for col in cols] for table, cols in self.tables.items()}
+
+    def column_types(self, table_name: str):
+        """
+        Return a mapping of column names to schema data types for one table.
+
+        Args:
+            table_name (str): Name of the table.
+
+        Returns:
+            dict: {column_name: data_type, ...}, empty if the table is unknown.
+        """
+        return {col.name: col.data_type for col in self.tables.get(table_name, [])}
+
+    def to_dict(self):
+        """
+        Return a JSON-serializable representation of the schema.
+        """
+        return {
+            "version": CACHE_FORMAT_VERSION,
+            "digest": self.digest,
+            "tables": {table: [list(col) for col in cols] for table, cols in self.tables.items()},
+            "relationships": [list(rel) for rel in self.relationships],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """
+        Build a CompiledSchema from the output of to_dict().
+        """
+        tables = {table: [SchemaColumn(*col) for col in cols] for table, cols in data["tables"].items()}
+        relationships = [Relationship(*rel) for rel in data["relationships"]]
+        return cls(data["digest"], tables, relationships)
+
+def compile_schema(content: bytes, digest: str):
+    """
+    Parse the raw contents of a schema CSV file.
+
+    The optional REFERENCES_TABLE and REFERENCES_COLUMN columns declare that a column
+    refers to a column of another table. REFERENCES_COLUMN defaults to the same column name.
+
+    Args:
+        content (bytes): Contents of the schema CSV file.
+        digest (str): Digest of the contents, stored on the result.
+
+    Returns:
+        CompiledSchema: The parsed schema.
+
+    Raises:
+        ValueError: If a required column is missing from the schema file, or a row
+            has no value for one.
+    """
+    rows = csv.reader(content.decode("utf-8-sig").splitlines(), skipinitialspace=True)
+    header = [name.strip() for name in next(rows, [])]
+    for required in ("TABLE_NAME", "COLUMN_NAME", "DATA_TYPE"):
+        if required not in header:
+            raise ValueError(f"Schema file is missing the {required} column.")
+    index = {name: i for i, name in enumerate(header)}
+
+    tables = {}
+    relationships = []
+    for row in rows:
+        if not any(field.strip() for field in row):
+            continue  # Skip blank lines
+        # Optional trailing columns may be left off
+        row = row + [""] * (len(header) - len(row))
+        missing = [name for name in ("TABLE_NAME", "COLUMN_NAME", "DATA_TYPE") if not row[index[name]].strip()]
+        if missing:
+            raise ValueError(f"Schema file line {rows.line_num} is missing {', '.join(missing)}.")
+        table_name = row[index["TABLE_NAME"]].strip()
+        cols = tables.setdefault(table_name, [])
+        ordinal = len(cols)
+        if "ORDINAL_POSITION" in index and row[index["ORDINAL_POSITION"]].strip().isdigit():
+            ordinal = int(row[index["ORDINAL_POSITION"]])
+        cols.append(SchemaColumn(
+            row[index["COLUMN_NAME"]].strip(),
+            row[index["DATA_TYPE"]].strip(),
+            ordinal,
+        ))
+        ref_table = row[index["REFERENCES_TABLE"]].strip() if "REFERENCES_TABLE" in index else ""
+        if ref_table:
+            column_name = row[index["COLUMN_NAME"]].strip()
+            ref_column = row[index["REFERENCES_COLUMN"]].strip() if "REFERENCES_COLUMN" in index else ""
+            relationships.append(Relationship(table_name, column_name, ref_table, ref_column or column_name))
+    return CompiledSchema(digest, dict(sorted(tables.items())), relationships)
+
+def load_schema(schema_file: str = DEFAULT_SCHEMA_FILE, cache_dir: str = None):
+    """
+    Return the compiled schema for a schema file, using the in-process and on-disk caches.
+
+    The cache key is the SHA-256 digest of the file contents, so any edit to the
+    schema file produces a fresh compile. Cache write failures are ignored.
+
+    Args:
+        schema_file (str): Path to the schema CSV file (default: DEFAULT_SCHEMA_FILE).
+        cache_dir (str, optional): Cache directory (default: config.SCHEMA_CACHE_DIR).
+
+    Returns:
+        CompiledSchema: The compiled schema.
+    """
+    with open(schema_file, "rb") as f:
+        content = f.read()
+    digest = hashlib.sha256(content).hexdigest()
+    if digest in _compiled:
+        return _compiled[digest]
+
+    cache_dir = cache_dir or config.SCHEMA_CACHE_DIR
+    cache_path = os.path.join(cache_dir, f"schema-{digest}.json")
+    schema = None
+    try:
+        with open(cache_path) as f:
+            data = json.load(f)
+        if data.get("version") == CACHE_FORMAT_VERSION:
+            schema = CompiledSchema.from_dict(data)
+    except (OSError, ValueError, KeyError, TypeError):
+        pass  # Missing or unreadable cache entry; compile below
+
+    if schema is None:
+        schema = compile_schema(content, digest)
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(schema.to_dict(), f)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass  # Caching is an optimization only
+
+    _compiled[digest] = schema
+    return schema
@@ -0,0 +1,261 @@
+import csv
+import io
+import json
+import os
+import queue
+import signal
+import threading
+from .config import DEFAULT_DATA_DIR, DEFAULT_SCHEMA_FILE
+from .schema_builder import create_tables
+from .schema_cache import load_schema
+
+class CsvWatcher:
+    """
+    Poll a data directory and ingest new or appended CSV rows in micro-batches.
+
+    The engine and the parsed schema are created once and reused for every batch.
+    A file is only picked up once its size and mtime are unchanged between two polls,
+    and only complete lines appended since the last committed offset are read. At most
+    one work unit per file is in flight, so a unit that fails is simply read again on a
+    later poll and no range is queued twice. Work units are passed
+    from the polling loop to a single ingest thread through a bounded queue, so a slow
+    database makes the poller wait instead of buffering unbounded work.
+    """
+
+    def __init__(
+        self,
+        engine,
+        data_dir: str = DEFAULT_DATA_DIR,
+        schema_file: str = DEFAULT_SCHEMA_FILE,
+        interval: float = 5.0,
+        batch_size: int = 1000,
+        queue_size: int = 8,
+        state_file: str = None,
+    ):
+        """
+        Args:
+            engine: SQLAlchemy engine instance connected to the target database.
+            data_dir (str): Directory to watch for CSV files (default: DEFAULT_DATA_DIR).
+            schema_file (str): Path to the schema file (default: DEFAULT_SCHEMA_FILE).
+            interval (float): Seconds between directory polls (default: 5.0).
+            batch_size (int): Maximum number of rows inserted per batch (default: 1000).
+            queue_size (int): Maximum number of pending work units (default: 8).
+            state_file (str, optional): JSON file used to persist ingested offsets across restarts.
+        """
+        self.engine = engine
+        self.data_dir = data_dir
+        self.schema_file = schema_file
+        self.interval = interval
+        self.batch_size = batch_size
+        self.state_file = state_file
+        self.compiled_schema = load_schema(schema_file)  # Parsed once, kept warm
+        self.schema = self.compiled_schema.columns()
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.stop_event = threading.Event()
+        self._last_seen = {}  # path -> (size, mtime_ns) observed on the previous poll
+        # path -> {"offset": int, "columns": [...], "inode": int}, written by the ingest thread
+        self._state = self._load_state()
+        self._in_flight = set()  # Paths with a queued or running work unit
+        self._lock = threading.Lock()  # Guards _state and _in_flight across the two threads
+
+    def _load_state(self):
+        """
+        Read previously committed offsets from the state file, if one is configured.
+
+        Returns:
+            dict: {path: {"offset": int, "columns": [...], "inode": int}, ...}
+        """
+        if not self.state_file or not os.path.exists(self.state_file):
+            return {}
+        with open(self.state_file) as f:
+            return json.load(f)
+
+    def _save_state(self):
+        """
+        Atomically write the committed offsets to the state file, if one is configured.
+        """
+        if not self.state_file:
+            return
+        tmp_path = f"{self.state_file}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._state, f)
+        os.replace(tmp_path, self.state_file)
+
+    def poll(self):
+        """
+        Scan the data directory once and return work units for settled files with new data.
+
+        A file that is smaller than its committed offset, or has a different inode than
+        the file that was ingested, was truncated or replaced; its unit is marked as a
+        reset and starts again from the header.
+
+        Returns:
+            list: Tuples of (table_name, path, start_offset, end_offset, reset).
+        """
+        units = []
+        for file in sorted(os.listdir(self.data_dir)):
+            # Only process CSV files, skip the schema definition file
+            if not file.lower().endswith(".csv") or file == "INFORMATION_SCHEMA.csv":
+                continue
+            path = os.path.join(self.data_dir, file)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue  # Removed between listdir and stat
+            signature = (stat.st_size, stat.st_mtime_ns)
+            previous = self._last_seen.get(path)
+            self._last_seen[path] = signature
+            if signature != previous:
+                continue  # New or still being written; wait for it to settle
+            with self._lock:
+                if path in self._in_flight:
+                    continue  # Picked up again once the current unit is committed or fails
+                committed = self._state.get(path, {})
+                offset = committed.get("offset", 0)
+                inode = committed.get("inode")
+                reset = stat.st_size < offset or (inode is not None and inode != stat.st_ino)
+                if reset:
+                    print(f"{file} was truncated or replaced, re-reading from the start.")
+                    offset = 0
+                if stat.st_size == offset:
+                    continue  # Nothing new since the last ingest
+                self._in_flight.add(path)
+            units.append((os.path.splitext(file)[0], path, offset, stat.st_size, reset))
+        return units
+
+    def ingest(self, table_name, path, start, end, reset=False):
+        """
+        Insert the rows stored between two byte offsets of a CSV file, in batches.
+
+        Only complete lines are read: a trailing partial line is left for a later poll.
+        All batches of a work unit are inserted in one transaction, and the offset is
+        only committed to the state once that transaction succeeds. A unit that does
+        not start at the committed offset, unless it is a reset, is stale and ignored.
+
+        Args:
+            table_name (str): Name of the table to insert data into.
+            path (str): Path to the CSV file.
+            start (int): Byte offset to start reading from (0 includes the header row).
+            end (int): Byte offset to stop reading at.
+            reset (bool): The file was truncated or replaced; read it again from the start.
+
+        Returns:
+            int: Number of rows inserted.
+        """
+        try:
+            return self._ingest(table_name, path, start, end, reset)
+        finally:
+            with self._lock:
+                self._in_flight.discard(path)
+
+    def _ingest(self, table_name, path, start, end, reset):
+        """
+        Read and insert one work unit; see ingest().
+        """
+        # pandas is only needed once there is data, which keeps watcher startup fast
+        import pandas as pd
+        from .loader import conform_to_schema, copy_frame, read_csv_compact
+
+        with self._lock:
+            committed = dict(self._state.get(path, {}))
+        if not reset and start != committed.get("offset", 0):
+            return 0  # Stale unit; the next poll starts from the committed offset
+
+        with open(path, "rb") as f:
+            inode = os.fstat(f.fileno()).st_ino
+            if not reset and committed.get("inode") not in (None, inode):
+                return 0  # Replaced since the poll; the next poll queues a reset
+            f.seek(start)
+            data = f.read(end - start)
+
+        # A writer may have paused mid-row; leave the partial line for the next poll
+        last_newline = data.rfind(b"\n")
+        if last_newline == -1:
+            return 0
+        data = data[:last_newline + 1]
+        end = start + len(data)
+
+        if start == 0:
+            # Remember the header so appended rows can be parsed later without it
+            header_line = data.split(b"\n", 1)[0].decode()
+            columns = next(csv.reader([header_line]), [])
+            read_kwargs = {}
+        else:
+            columns = committed.get("columns")
+            if columns is None:
+                print(f"Skipping {path}: header for appended rows is unknown.")
+                return 0
+            read_kwargs = {"header": None, "names": columns}
+
+        inserted = 0
+        try:
+            column_types = self.compiled_schema.column_types(table_name)
+            reader = read_csv_compact(io.BytesIO(data), column_types, self.batch_size, **read_kwargs)
+            with self.engine.begin() as conn:
+                for chunk in reader:
+                    chunk = conform_to_schema(table_name, chunk, self.schema)
+                    if chunk is None:
+                        print(f"Skipping {path} due to schema mismatch, will retry.\n")
+                        return 0
+                    inserted += copy_frame(conn, table_name, chunk, column_types)
+        except pd.errors.EmptyDataError:
+            pass  # Header only or blank lines; still advance the offset
+        except Exception as e:
+            print(f"Failed to ingest bytes {start}-{end} of {path}, will retry: {e}")
+            return 0
+
+        with self._lock:
+            self._state[path] = {"offset": end, "columns": columns, "inode": inode}
+            self._save_state()
+        if inserted:
+            print(f"Inserted {inserted} rows into {table_name}")
+        return inserted
+
+    def _ingest_worker(self):
+        """
+        Consume work units from the queue until the shutdown sentinel arrives.
+        """
+        while True:
+            unit = self.queue.get()
+            try:
+                if unit is None:
+                    return
+                self.ingest(*unit)
+            finally:
+                self.queue.task_done()
+
+    def stop(self, *_):
+        """
+        Request a graceful shutdown; queued work is drained before run() returns.
+        """
+        self.stop_event.set()
+
+    def run(self):
+        """
+        Create missing tables and poll the data directory until stop() is called or SIGINT/SIGTERM is received.
+
+        Returns:
+            None
+        """
+        # Keep existing data: only create tables that are not there yet
+        create_tables(self.schema_file, self.engine, drop_existing=False)
+
+        previous_handlers = {}
+        if threading.current_thread() is threading.main_thread():
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                previous_handlers[sig] = signal.signal(sig, self.stop)
+
+        worker = threading.Thread(target=self._ingest_worker, name="csv-watch-ingest", daemon=True)
+        worker.start()
+        try:
+            while not self.stop_event.is_set():
+                for unit in self.poll():
+                    # Blocks while the queue is full, which throttles polling to the ingest rate
+                    self.queue.put(unit)
+                self.stop_event.wait(self.interval)
+        finally:
+            print("Stopping watcher, finishing queued batches...")
+            self.queue.put(None)
+            worker.join()
+            for sig, handler in previous_handlers.items():
+                signal.signal(sig, handler)
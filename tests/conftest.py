@@ -40,12 +40,14 @@ def test_db_url():
 def patch_db_url_and_reset_engine(monkeypatch, test_db_url):
     """
     Automatically patch src.db.DATABASE_URL and src.config.DATABASE_URL,
-    and reset src.db._engine before each test.
+    and reset the cached engines and session factories in src.db before each test.
     Ensures all code using db.get_engine() uses the correct test DB URL.
     """
     monkeypatch.setattr("src.config.DATABASE_URL", test_db_url, raising=False)
     monkeypatch.setattr("src.db.DATABASE_URL", test_db_url, raising=False)
     monkeypatch.setattr("src.db._engine", None, raising=False)
+    monkeypatch.setattr("src.db._engines", {}, raising=False)
+    monkeypatch.setattr("src.db._session_factories", {}, raising=False)
 
 @pytest.fixture
 def engine(test_db_url):
@@ -54,4 +56,12 @@ def engine(test_db_url):
     Returns a direct engine for tests that use the fixture explicitly;
     code paths calling db.get_engine() will also work with the patched URL.
     """
-    return create_engine(test_db_url, future=True)
\ No newline at end of file
+    return create_engine(test_db_url, future=True)
+
+@pytest.fixture(autouse=True)
+def isolate_schema_cache(monkeypatch, tmp_path):
+    """
+    Point the compiled schema cache at a per-test directory and clear the in-process cache.
+    """
+    monkeypatch.setattr("src.config.SCHEMA_CACHE_DIR", str(tmp_path / "schema_cache"))
+    monkeypatch.setattr("src.schema_cache._compiled", {})
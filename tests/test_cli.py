@@ -21,7 +21,7 @@ def test_cli_load_db_error(monkeypatch, temp_data_dir):
     """
     runner = CliRunner()
     # Patch get_engine to raise an exception
-    monkeypatch.setattr("src.cli.get_engine", lambda: (_ for _ in ()).throw(Exception("DB connection failed")))
+    monkeypatch.setattr("src.cli.get_engine", lambda profile="default": (_ for _ in ()).throw(Exception("DB connection failed")))
     config.DEFAULT_DATA_DIR = temp_data_dir
     config.DEFAULT_SCHEMA_FILE = os.path.join(temp_data_dir, "INFORMATION_SCHEMA.csv")
     result = runner.invoke(cli.cli, ["load"])
@@ -35,7 +35,7 @@ def test_cli_load_schema_error(monkeypatch, temp_data_dir):
     runner = CliRunner()
     # Patch get_engine to return a valid engine
     from sqlalchemy import create_engine
-    monkeypatch.setattr("src.cli.get_engine", lambda: create_engine(os.environ["TEST_DATABASE_URL"], future=True))
+    monkeypatch.setattr("src.cli.get_engine", lambda profile="default": create_engine(os.environ["TEST_DATABASE_URL"], future=True))
     # Patch schema_builder.create_tables to raise an exception
     monkeypatch.setattr("src.cli.schema_builder.create_tables", lambda schema, engine: (_ for _ in ()).throw(Exception("Schema error")))
     config.DEFAULT_DATA_DIR = temp_data_dir
@@ -50,7 +50,7 @@ def test_cli_load_loader_error(monkeypatch, temp_data_dir):
     """
     runner = CliRunner()
     from sqlalchemy import create_engine
-    monkeypatch.setattr("src.cli.get_engine", lambda: create_engine(os.environ["TEST_DATABASE_URL"], future=True))
+    monkeypatch.setattr("src.cli.get_engine", lambda profile="default": create_engine(os.environ["TEST_DATABASE_URL"], future=True))
     # Patch schema_builder.create_tables to do nothing
     monkeypatch.setattr("src.cli.schema_builder.create_tables", lambda schema, engine: None)
     # Patch loader.load_all to raise an exception
@@ -66,8 +66,43 @@ def test_cli_run_queries_error(monkeypatch, temp_data_dir):
     Test that the CLI run_queries command handles errors gracefully.
     """
     runner = CliRunner()
-    # Patch queries.overdrawn_checking_accounts to raise an exception
-    monkeypatch.setattr("src.cli.queries.overdrawn_checking_accounts", lambda: (_ for _ in ()).throw(Exception("Query error")))
+    # Patch queries.run_report to raise an exception
+    monkeypatch.setattr("src.cli.queries.run_report", lambda name, params=None: (_ for _ in ()).throw(Exception("Query error")))
     result = runner.invoke(cli.cli, ["run-queries"])
     assert result.exit_code != 0
-    assert "Error running queries: Query error" in result.output
\ No newline at end of file
+    assert "Error running queries: Query error" in result.output
+
+def test_cli_run_queries_by_name_with_params(monkeypatch):
+    """
+    Test that run-queries runs only the named reports and passes each one only the parameters it declares.
+    """
+    runner = CliRunner()
+    calls = []
+    monkeypatch.setattr("src.cli.queries.run_report", lambda name, params=None: calls.append((name, params)) or [])
+    result = runner.invoke(cli.cli, [
+        "run-queries", "overdrawn_checking_accounts", "total_assets",
+        "--member-guid", "m1", "--member-guid", "m2", "--account-guid", "a1",
+        "--as-of", "2024-01-31", "--min-overdraft", "10.50"
+    ])
+    assert result.exit_code == 0, result.output
+    assert "Overdrawn Checking Accounts:" in result.output
+    assert "Overpaid Loans:" not in result.output
+    assert [name for name, _ in calls] == ["overdrawn_checking_accounts", "total_assets"]
+    assert calls[0][1]["member_guids"] == ["m1", "m2"]
+    assert str(calls[0][1]["min_overdraft"]) == "10.50"
+    assert calls[0][1]["account_guids"] == ["a1"]
+    assert set(calls[1][1]) == {"account_guids", "as_of_date"}
+
+    result = runner.invoke(cli.cli, ["run-queries", "no_such_report"])
+    assert result.exit_code != 0
+    assert "Unknown report" in result.output
+
+def test_cli_watch_rejects_non_positive_sizes(temp_data_dir):
+    """
+    Test that watch refuses a zero batch or queue size, which would disable batching or backpressure.
+    """
+    runner = CliRunner()
+    for option in ("--batch-size", "--queue-size"):
+        result = runner.invoke(cli.cli, ["watch", "--data-dir", temp_data_dir, option, "0"])
+        assert result.exit_code == 2
+        assert "0 is not in the range x>=1" in result.output
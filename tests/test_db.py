@@ -0,0 +1,90 @@
+import threading
+import time
+import pytest
+from sqlalchemy import event, text
+from src import config, db
+
+def test_engine_profile_precedence(monkeypatch, tmp_path):
+    """
+    Test that built-in profiles, the config file and environment variables are applied in order.
+    """
+    config_file = tmp_path / "csv_loader.ini"
+    config_file.write_text(
+        "[engine]\npool_size = 7\n\n"
+        "[engine:bulk]\nwork_mem = 32MB\n\n"
+        "[engine:reporting]\nstatement_timeout = 30s\n"
+    )
+    monkeypatch.setattr("src.config.CONFIG_FILE", str(config_file))
+    monkeypatch.setenv("DB_BULK_POOL_SIZE", "3")
+    monkeypatch.setenv("DB_STATEMENT_TIMEOUT", "none")
+
+    bulk = config.get_engine_profile("bulk")
+    assert bulk["pool_size"] == 3
+    assert bulk["work_mem"] == "32MB"
+    assert bulk["statement_timeout"] is None
+    assert bulk["maintenance_work_mem"] == config.ENGINE_PROFILES["bulk"]["maintenance_work_mem"]
+
+    assert config.get_engine_profile("default")["pool_size"] == 7
+    assert config.get_engine_profile("reporting")["pool_size"] == 7
+    with pytest.raises(ValueError):
+        config.get_engine_profile("missing")
+
+def test_profile_engines_apply_session_settings():
+    """
+    Test that each profile gets its own cached engine with its session settings applied on connect.
+    """
+    bulk = db.get_engine("bulk")
+    assert db.get_engine("bulk") is bulk
+    assert db.get_engine("analytics") is not bulk
+    with bulk.connect() as conn:
+        assert conn.execute(text("SHOW work_mem")).scalar() == config.ENGINE_PROFILES["bulk"]["work_mem"]
+        # Settings must survive the end of the transaction they were set in
+        conn.rollback()
+        assert conn.execute(text("SHOW application_name")).scalar() == "csv_loader"
+
+def test_session_factory_is_reused():
+    """
+    Test that get_session() reuses one session factory per profile.
+    """
+    with db.get_session("analytics") as first, db.get_session("analytics") as second:
+        assert first is not second
+        assert first.execute(text("SHOW statement_timeout")).scalar() == "10min"
+        assert first.execute(text("SHOW plan_cache_mode")).scalar() == "force_custom_plan"
+    factory = db._session_factories["analytics"][1]
+    db.get_session("analytics").close()
+    assert db._session_factories["analytics"][1] is factory
+
+def test_pool_stats_record_checkout_waits(monkeypatch):
+    """
+    Test that pool statistics count checkouts and record waits when the pool is exhausted.
+    """
+    monkeypatch.setenv("DB_POOL_SIZE", "1")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "0")
+    engine = db.get_engine()
+    holder = engine.connect()
+    release = threading.Timer(0.2, holder.close)
+    release.start()
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    release.join()
+
+    stats = db.get_pool_stats(engine)
+    assert stats["size"] == 1
+    assert stats["checked_out"] == 0
+    assert stats["checkouts"] == 2
+    assert stats["wait_max_s"] >= 0.1
+    assert stats["timeouts"] == 0
+
+def test_pool_stats_separate_connect_time():
+    """
+    Test that opening a new connection is recorded as connect time, not as checkout wait.
+    """
+    engine = db.get_engine()
+    event.listen(engine, "connect", lambda dbapi_connection, connection_record: time.sleep(0.2))
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    stats = db.get_pool_stats(engine)
+    assert stats["connects"] == 1
+    assert stats["connect_max_s"] >= 0.2
+    assert stats["wait_max_s"] < 0.1
@@ -0,0 +1,84 @@
+import os
+import pandas as pd
+from click.testing import CliRunner
+from src import cli, explain, schema_builder
+
+def _record(plan, execution_time_ms=10.0):
+    return {"query": "q", "execution_time_ms": execution_time_ms, "plan": plan}
+
+def _scan(node_type, relation, plan_rows=100, actual_rows=100):
+    return {
+        "Node Type": node_type,
+        "Relation Name": relation,
+        "Plan Rows": plan_rows,
+        "Actual Rows": actual_rows,
+        "Actual Loops": 1,
+    }
+
+def test_compare_plans_flags_new_seq_scan():
+    """
+    Test that a sequential scan missing from the baseline is reported.
+    """
+    baseline = _record({"Node Type": "Hash Join", "Plans": [_scan("Index Scan", "TRANSACTIONS")]})
+    current = _record({"Node Type": "Hash Join", "Plans": [_scan("Seq Scan", "TRANSACTIONS")]})
+    assert explain.compare_plans("q", baseline, current) == ["q: new sequential scan on TRANSACTIONS"]
+    assert explain.compare_plans("q", current, current) == []
+
+def test_compare_plans_flags_row_estimate_blowup():
+    """
+    Test that a row misestimate above the threshold and worse than the baseline is reported.
+    """
+    baseline = _record(_scan("Seq Scan", "ACCOUNTS", plan_rows=100, actual_rows=120))
+    current = _record(_scan("Seq Scan", "ACCOUNTS", plan_rows=10, actual_rows=5000))
+    regressions = explain.compare_plans("q", baseline, current)
+    assert len(regressions) == 1
+    assert "row estimate off by 500.0x at Seq Scan on ACCOUNTS" in regressions[0]
+
+def test_compare_plans_flags_runtime_growth():
+    """
+    Test that runtime growth is only reported above both the relative and absolute thresholds.
+    """
+    plan = _scan("Seq Scan", "ACCOUNTS")
+    assert explain.compare_plans("q", _record(plan, 10.0), _record(plan, 14.0)) == []
+    assert explain.compare_plans("q", _record(plan, 0.1), _record(plan, 0.5)) == []
+    assert explain.compare_plans("q", _record(plan, 10.0), _record(plan, 20.0)) == [
+        "q: execution time 20.00 ms vs baseline 10.00 ms"
+    ]
+
+def test_run_queries_explain_and_check_plans(engine, tmp_path):
+    """
+    Test capturing plans with run-queries --explain and checking them against a baseline.
+    """
+    schema_file = str(tmp_path / "INFORMATION_SCHEMA.csv")
+    pd.DataFrame([
+        {"TABLE_NAME": "MEMBERS", "COLUMN_NAME": "MEMBER_GUID", "DATA_TYPE": "varchar"},
+        {"TABLE_NAME": "MEMBERS", "COLUMN_NAME": "FIRST_NAME", "DATA_TYPE": "varchar"},
+        {"TABLE_NAME": "MEMBERS", "COLUMN_NAME": "LAST_NAME", "DATA_TYPE": "varchar"},
+        {"TABLE_NAME": "ACCOUNTS", "COLUMN_NAME": "ACCOUNT_GUID", "DATA_TYPE": "varchar"},
+        {"TABLE_NAME": "ACCOUNTS", "COLUMN_NAME": "MEMBER_GUID", "DATA_TYPE": "varchar"},
+        {"TABLE_NAME": "CHECKING", "COLUMN_NAME": "ACCOUNT_GUID", "DATA_TYPE": "varchar"},
+        {"TABLE_NAME": "CHECKING", "COLUMN_NAME": "STARTING_BALANCE", "DATA_TYPE": "numeric"},
+        {"TABLE_NAME": "LOANS", "COLUMN_NAME": "ACCOUNT_GUID", "DATA_TYPE": "varchar"},
+        {"TABLE_NAME": "LOANS", "COLUMN_NAME": "STARTING_DEBT", "DATA_TYPE": "numeric"},
+        {"TABLE_NAME": "TRANSACTIONS", "COLUMN_NAME": "ACCOUNT_GUID", "DATA_TYPE": "varchar"},
+        {"TABLE_NAME": "TRANSACTIONS", "COLUMN_NAME": "TRANSACTION_AMOUNT", "DATA_TYPE": "numeric"},
+        {"TABLE_NAME": "TRANSACTIONS", "COLUMN_NAME": "POST_DATE", "DATA_TYPE": "date"},
+    ]).to_csv(schema_file, index=False)
+    schema_builder.create_tables(schema_file, engine)
+
+    runner = CliRunner()
+    baseline_dir = str(tmp_path / "baseline")
+    result = runner.invoke(cli.cli, ["run-queries", "--explain", "--plan-dir", baseline_dir])
+    assert result.exit_code == 0, result.output
+    assert sorted(os.listdir(baseline_dir)) == [
+        "overdrawn_checking_accounts.json", "overpaid_loans.json", "total_assets.json"
+    ]
+    record = explain.load_plans(baseline_dir)["total_assets"]
+    assert record["execution_time_ms"] is not None
+    assert "Node Type" in record["plan"]
+
+    result = runner.invoke(cli.cli, [
+        "check-plans", "--baseline", baseline_dir, "--current", baseline_dir
+    ])
+    assert result.exit_code == 0
+    assert "No plan regressions found" in result.output
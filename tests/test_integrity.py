@@ -0,0 +1,117 @@
+import pandas as pd
+import pytest
+from click.testing import CliRunner
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import IntegrityError
+from src import cli, integrity, schema_builder, schema_cache
+
+RELATIONSHIP = schema_cache.Relationship("TRANSACTIONS", "ACCOUNT_GUID", "ACCOUNTS", "ACCOUNT_GUID")
+
+@pytest.fixture(autouse=True)
+def drop_constraints(engine):
+    """
+    Drop the foreign key after each test so other tests can recreate the tables without declaring it.
+    """
+    yield
+    with engine.begin() as conn:
+        integrity.drop_foreign_keys(conn, [RELATIONSHIP])
+
+def _load_tables(engine, tmp_path, accounts, transactions):
+    """
+    Create ACCOUNTS and TRANSACTIONS with a declared relationship and insert the given rows.
+    """
+    schema_file = str(tmp_path / "INFORMATION_SCHEMA.csv")
+    pd.DataFrame([
+        {"TABLE_NAME": "ACCOUNTS", "COLUMN_NAME": "ACCOUNT_GUID", "DATA_TYPE": "varchar"},
+        {"TABLE_NAME": "TRANSACTIONS", "COLUMN_NAME": "ACCOUNT_GUID", "DATA_TYPE": "varchar",
+         "REFERENCES_TABLE": "ACCOUNTS", "REFERENCES_COLUMN": "ACCOUNT_GUID"},
+        {"TABLE_NAME": "TRANSACTIONS", "COLUMN_NAME": "TRANSACTION_AMOUNT", "DATA_TYPE": "numeric"},
+    ]).to_csv(schema_file, index=False)
+    schema_builder.create_tables(schema_file, engine)
+    with engine.begin() as conn:
+        pd.DataFrame({"ACCOUNT_GUID": accounts}).to_sql("ACCOUNTS", conn, if_exists="append", index=False)
+        pd.DataFrame(transactions, columns=["ACCOUNT_GUID", "TRANSACTION_AMOUNT"]).to_sql(
+            "TRANSACTIONS", conn, if_exists="append", index=False
+        )
+    return schema_file
+
+def test_check_integrity_counts_and_samples_orphans(engine, tmp_path):
+    """
+    Test that orphan rows are counted per key, NULL keys are ignored and samples are ordered by row count.
+    """
+    schema_file = _load_tables(engine, tmp_path, ["a1"], [
+        ("a1", 10), ("x1", 1), ("x2", 2), ("x2", 3), (None, 4),
+    ])
+    [report] = integrity.check_integrity(engine, schema_file, sample_size=1)
+    assert integrity.describe(report.relationship) == "TRANSACTIONS.ACCOUNT_GUID -> ACCOUNTS.ACCOUNT_GUID"
+    assert (report.orphan_rows, report.orphan_keys) == (3, 2)
+    assert report.samples == [("x2", 2)]
+
+    [report] = integrity.check_integrity(engine, schema_file, sample_size=0)
+    assert (report.orphan_rows, report.samples) == (3, [])
+
+def test_add_foreign_keys_validates_clean_relationships(engine, tmp_path):
+    """
+    Test that a foreign key is added and validated, enforced afterwards, and dropped when tables are recreated.
+    """
+    schema_file = _load_tables(engine, tmp_path, ["a1", "a2"], [("a1", 10), ("a2", 5)])
+    relationships = schema_cache.load_schema(schema_file).relationships
+    assert relationships == [RELATIONSHIP]
+    [status] = integrity.add_foreign_keys(engine, relationships).values()
+    assert status == "TRANSACTIONS_ACCOUNT_GUID_fkey added and validated"
+    [status] = integrity.add_foreign_keys(engine, relationships).values()
+    assert status == "TRANSACTIONS_ACCOUNT_GUID_fkey already validated"
+
+    with pytest.raises(IntegrityError, match="TRANSACTIONS_ACCOUNT_GUID_fkey"), engine.begin() as conn:
+        conn.execute(text("""INSERT INTO "TRANSACTIONS" ("ACCOUNT_GUID") VALUES ('missing')"""))
+
+    # Recreating the tables must not be blocked by the constraints
+    _load_tables(engine, tmp_path, ["a1"], [("x1", 1)])
+    [status] = integrity.add_foreign_keys(engine, relationships).values()
+    assert status == "not added: TRANSACTIONS.ACCOUNT_GUID has orphan rows"
+
+def test_cli_check_integrity(monkeypatch, engine, tmp_path, test_db_url):
+    """
+    Test that check-integrity prints orphan samples and exits non-zero when orphans exist.
+    """
+    monkeypatch.setattr("src.cli.get_engine", lambda profile="default": create_engine(test_db_url, future=True))
+    schema_file = _load_tables(engine, tmp_path, ["a1"], [("a1", 10), ("x1", 1)])
+    runner = CliRunner()
+    result = runner.invoke(cli.cli, ["check-integrity", "--schema", schema_file, "--add-constraints"])
+    assert result.exit_code == 1
+    assert "TRANSACTIONS.ACCOUNT_GUID -> ACCOUNTS.ACCOUNT_GUID: 1 orphan rows (1 keys)" in result.output
+    assert "    x1 (1 rows)" in result.output
+    assert "added and validated" not in result.output
+
+    with engine.begin() as conn:
+        conn.execute(text("""DELETE FROM "TRANSACTIONS" WHERE "ACCOUNT_GUID" = 'x1'"""))
+    result = runner.invoke(cli.cli, ["check-integrity", "--schema", schema_file, "--add-constraints"])
+    assert result.exit_code == 0, result.output
+    assert "TRANSACTIONS_ACCOUNT_GUID_fkey added and validated" in result.output
+    assert "No orphan rows found." in result.output
+
+def test_add_foreign_keys_reports_duplicate_parent_keys(engine, tmp_path):
+    """
+    Test that a referenced column with duplicates gets no constraint and no leftover index.
+    """
+    schema_file = _load_tables(engine, tmp_path, ["a1", "a1"], [("a1", 10)])
+    relationships = schema_cache.load_schema(schema_file).relationships
+    [status] = integrity.add_foreign_keys(engine, relationships).values()
+    assert status == "not added: ACCOUNTS.ACCOUNT_GUID has duplicate values"
+    with engine.connect() as conn:
+        indexes = conn.execute(text("""SELECT indexname FROM pg_indexes WHERE tablename = 'ACCOUNTS'""")).all()
+    assert indexes == []
+
+def test_add_foreign_keys_reuses_existing_primary_key(engine, tmp_path):
+    """
+    Test that a referenced column with a primary key under another name gets no second unique index.
+    """
+    schema_file = _load_tables(engine, tmp_path, ["a1"], [("a1", 10)])
+    with engine.begin() as conn:
+        conn.execute(text('ALTER TABLE "ACCOUNTS" ADD CONSTRAINT accounts_pk PRIMARY KEY ("ACCOUNT_GUID")'))
+    relationships = schema_cache.load_schema(schema_file).relationships
+    [status] = integrity.add_foreign_keys(engine, relationships).values()
+    assert status == "TRANSACTIONS_ACCOUNT_GUID_fkey added and validated"
+    with engine.connect() as conn:
+        indexes = conn.execute(text("""SELECT indexname FROM pg_indexes WHERE tablename = 'ACCOUNTS'""")).scalars().all()
+    assert indexes == ["accounts_pk"]
@@ -1,4 +1,6 @@
+import io
 import os
+from decimal import Decimal
 import pandas as pd
 from sqlalchemy import inspect, text
 from src import schema_builder, loader
@@ -209,4 +211,101 @@ def test_loader_handles_empty_csv(engine, temp_data_dir):
     with engine.connect() as conn:
         result = conn.execute(text('SELECT COUNT(*) FROM "EMPTY_TABLE"'))
         count = result.scalar()
-    assert count == 0
\ No newline at end of file
+    assert count == 0
+
+def test_read_csv_compact_uses_compact_types():
+    """
+    Test that key and date columns are dictionary-encoded and NUMERIC(p,s) columns become scaled int64.
+    """
+    csv_text = (
+        "ACCOUNT_GUID,TRANSACTION_AMOUNT,POST_DATE,NOTE\n"
+        "a1,10.10,2024-01-01,x\n"
+        "a1,-0.05,2024-01-01,y\n"
+        "a2,,2024-01-02,z\n"
+    )
+    column_types = {"ACCOUNT_GUID": "VARCHAR", "TRANSACTION_AMOUNT": "NUMERIC(38,2)", "POST_DATE": "DATE", "NOTE": "VARCHAR"}
+    chunk = next(loader.read_csv_compact(io.StringIO(csv_text), column_types))
+    assert isinstance(chunk["ACCOUNT_GUID"].dtype, pd.CategoricalDtype)
+    assert list(chunk["ACCOUNT_GUID"].cat.categories) == ["a1", "a2"]
+    assert isinstance(chunk["POST_DATE"].dtype, pd.CategoricalDtype)
+    assert not isinstance(chunk["NOTE"].dtype, pd.CategoricalDtype)
+    assert chunk["TRANSACTION_AMOUNT"].dtype == "Int64"
+    assert chunk["TRANSACTION_AMOUNT"].tolist()[:2] == [1010, -5]
+    assert list(loader.format_scaled_int(chunk["TRANSACTION_AMOUNT"], 2)) == ["10.10", "-0.05", None]
+
+def test_loader_copies_exact_numeric_values(engine, tmp_path):
+    """
+    Test that NUMERIC(38,2) values are loaded exactly, in several chunks, with nulls preserved.
+    """
+    schema_file = str(tmp_path / "INFORMATION_SCHEMA.csv")
+    pd.DataFrame({
+        "TABLE_NAME": ["AMOUNTS", "AMOUNTS"],
+        "COLUMN_NAME": ["ACCOUNT_GUID", "AMOUNT"],
+        "DATA_TYPE": ["VARCHAR", "NUMERIC(38,2)"]
+    }).to_csv(schema_file, index=False)
+    data_file = str(tmp_path / "AMOUNTS.csv")
+    with open(data_file, "w") as f:
+        f.write('AMOUNT,ACCOUNT_GUID,EXTRA\n0.10,"a,1",1\n0.20,a2,2\n-1234567890.99,a2,3\n,a3,4\n12345678901234567.89,a4,5\n')
+    schema_builder.create_tables(schema_file, engine)
+    schema = schema_builder.get_schema_columns(schema_file)
+    column_types = {"ACCOUNT_GUID": "VARCHAR", "AMOUNT": "NUMERIC(38,2)"}
+    loader.load_csv(engine, "AMOUNTS", data_file, schema, column_types, chunksize=2)
+    with engine.connect() as conn:
+        rows = conn.execute(text('SELECT "ACCOUNT_GUID", "AMOUNT" FROM "AMOUNTS"')).all()
+    assert sorted(rows, key=str) == sorted([
+        ("a,1", Decimal("0.10")),
+        ("a2", Decimal("0.20")),
+        ("a2", Decimal("-1234567890.99")),
+        ("a3", None),
+        ("a4", Decimal("12345678901234567.89")),
+    ], key=str)
+
+def test_loader_rounds_extra_decimal_places_like_postgres(engine, tmp_path):
+    """
+    Test that values with more decimal places than the scale are rounded half away from zero by PostgreSQL.
+    """
+    column_types = {"AMOUNT": "NUMERIC(38,2)"}
+    [chunk] = loader.read_csv_compact(io.StringIO("AMOUNT\n0.125\n1.005\n"), column_types)
+    assert not isinstance(chunk["AMOUNT"].dtype, pd.Int64Dtype)  # Kept as text
+    [chunk] = loader.read_csv_compact(io.StringIO("AMOUNT\n0.12\n1.01\n"), column_types)
+    assert isinstance(chunk["AMOUNT"].dtype, pd.Int64Dtype)
+
+    schema_file = str(tmp_path / "INFORMATION_SCHEMA.csv")
+    pd.DataFrame({
+        "TABLE_NAME": ["AMOUNTS"], "COLUMN_NAME": ["AMOUNT"], "DATA_TYPE": ["NUMERIC(38,2)"]
+    }).to_csv(schema_file, index=False)
+    data_file = str(tmp_path / "AMOUNTS.csv")
+    with open(data_file, "w") as f:
+        f.write("AMOUNT\n0.125\n1.005\n-0.125\n2.50\n")
+    schema_builder.create_tables(schema_file, engine)
+    loader.load_csv(engine, "AMOUNTS", data_file, {"AMOUNTS": ["AMOUNT"]}, column_types, chunksize=2)
+    with engine.connect() as conn:
+        amounts = conn.execute(text('SELECT "AMOUNT" FROM "AMOUNTS"')).scalars().all()
+    assert sorted(amounts) == [Decimal("-0.13"), Decimal("0.13"), Decimal("1.01"), Decimal("2.50")]
+
+def test_loader_copies_nulls_in_single_column_tables(engine, tmp_path):
+    """
+    Test that missing values in one-column NUMERIC and VARCHAR tables are loaded as NULL.
+    """
+    schema_file = str(tmp_path / "INFORMATION_SCHEMA.csv")
+    pd.DataFrame({
+        "TABLE_NAME": ["AMOUNTS", "NAMES"],
+        "COLUMN_NAME": ["AMOUNT", "NAME"],
+        "DATA_TYPE": ["NUMERIC(38,2)", "VARCHAR"]
+    }).to_csv(schema_file, index=False)
+    schema_builder.create_tables(schema_file, engine)
+    schema = schema_builder.get_schema_columns(schema_file)
+    for table, content, column_type in [
+        ("AMOUNTS", "AMOUNT\n1.50\nNA\n2.00\n", "NUMERIC(38,2)"),
+        ("NAMES", "NAME\nx\nNA\n", "VARCHAR"),
+    ]:
+        data_file = str(tmp_path / f"{table}.csv")
+        with open(data_file, "w") as f:
+            f.write(content)
+        loader.load_csv(engine, table, data_file, schema, {schema[table][0]: column_type})
+
+    with engine.connect() as conn:
+        amounts = conn.execute(text('SELECT "AMOUNT" FROM "AMOUNTS"')).scalars().all()
+        names = conn.execute(text('SELECT "NAME" FROM "NAMES"')).scalars().all()
+    assert sorted(amounts, key=str) == [Decimal("1.50"), Decimal("2.00"), None]
+    assert sorted(names, key=str) == [None, "x"]
@@ -1,10 +1,14 @@
 import os
+from datetime import date
+from decimal import Decimal
 import pandas as pd
-from src import schema_builder, loader, queries
+import pytest
+from sqlalchemy import text
+from src import db, schema_builder, loader, queries
 
-def test_query_results_on_sample_data(engine, temp_data_dir):
+def _load_sample_data(engine, temp_data_dir):
     """
-    Test that the analysis queries return expected results for known input data.
+    Create the report tables and load a small known data set.
     """
     schema_file = os.path.join(temp_data_dir, "INFORMATION_SCHEMA.csv")
     schema_df = pd.DataFrame([
@@ -19,6 +23,7 @@ def test_query_results_on_sample_data(engine, temp_data_dir):
         {"TABLE_NAME": "LOANS", "COLUMN_NAME": "STARTING_DEBT", "DATA_TYPE": "numeric"},
         {"TABLE_NAME": "TRANSACTIONS", "COLUMN_NAME": "ACCOUNT_GUID", "DATA_TYPE": "varchar"},
         {"TABLE_NAME": "TRANSACTIONS", "COLUMN_NAME": "TRANSACTION_AMOUNT", "DATA_TYPE": "numeric"},
+        {"TABLE_NAME": "TRANSACTIONS", "COLUMN_NAME": "POST_DATE", "DATA_TYPE": "date"},
     ])
     schema_df.to_csv(schema_file, index=False)
 
@@ -36,13 +41,19 @@ def test_query_results_on_sample_data(engine, temp_data_dir):
         {"ACCOUNT_GUID": "a2", "STARTING_DEBT": 50},
     ]).to_csv(os.path.join(temp_data_dir, "LOANS.csv"), index=False)
     pd.DataFrame([
-        {"ACCOUNT_GUID": "a1", "TRANSACTION_AMOUNT": 25},
-        {"ACCOUNT_GUID": "a2", "TRANSACTION_AMOUNT": 100},
+        {"ACCOUNT_GUID": "a1", "TRANSACTION_AMOUNT": 25, "POST_DATE": "2024-01-10"},
+        {"ACCOUNT_GUID": "a2", "TRANSACTION_AMOUNT": 100, "POST_DATE": "2024-02-10"},
     ]).to_csv(os.path.join(temp_data_dir, "TRANSACTIONS.csv"), index=False)
 
     schema_builder.create_tables(schema_file, engine)
     loader.load_all(engine, temp_data_dir, schema_file)
 
+def test_query_results_on_sample_data(engine, temp_data_dir):
+    """
+    Test that the analysis queries return expected results for known input data.
+    """
+    _load_sample_data(engine, temp_data_dir)
+
     rows = queries.overdrawn_checking_accounts()
     assert any(row._mapping["FIRST_NAME"] == "Alice" and row._mapping["balance"] == -75 for row in rows)
 
@@ -52,4 +63,76 @@ def test_query_results_on_sample_data(engine, temp_data_dir):
     total = queries.total_assets()
     # total assets = checking balance sum - remaining loan debt sum
     # checking: -100 + 25 = -75, loan: 50 - 100 = -50, so total = -75 - (-50) = -25
-    assert total == -25
\ No newline at end of file
+    assert total == -25
+
+def test_report_parameters_filter_results(engine, temp_data_dir):
+    """
+    Test that member, as-of date and minimum overdraft parameters filter report results.
+    """
+    _load_sample_data(engine, temp_data_dir)
+
+    assert queries.overdrawn_checking_accounts(member_guids=["m1"])
+    assert queries.overdrawn_checking_accounts(member_guids=["other"]) == []
+    assert queries.overdrawn_checking_accounts(account_guids=["a1"])
+    assert queries.overdrawn_checking_accounts(account_guids=["a2"]) == []
+    assert queries.overpaid_loans(account_guids=["a1"]) == []
+    # Only the loan account: 50 debt - 100 paid = -50 remaining debt
+    assert queries.total_assets(account_guids=["a2"]) == 50
+    assert queries.overdrawn_checking_accounts(min_overdraft=Decimal("75"))
+    assert queries.overdrawn_checking_accounts(min_overdraft=Decimal("76")) == []
+
+    # Before any transaction posted: checking -100, loan 50 still owed
+    assert queries.total_assets(as_of_date=date(2024, 1, 1)) == -150
+    assert queries.overpaid_loans(as_of_date=date(2024, 1, 31)) == []
+    assert queries.overpaid_loans(as_of_date=date(2024, 2, 28))
+
+    with pytest.raises(ValueError):
+        queries.run_report("total_assets", {"member_guids": ["m1"]})
+
+def test_reports_run_as_reused_prepared_statements(engine, temp_data_dir):
+    """
+    Test that a report is prepared once per connection and reused by later calls.
+    """
+    _load_sample_data(engine, temp_data_dir)
+    report = queries.get_report("total_assets")
+
+    queries.total_assets()
+    queries.total_assets(as_of_date=date(2024, 1, 1))
+    with db.get_session("analytics") as session:
+        prepared = session.execute(
+            text("SELECT name FROM pg_prepared_statements WHERE name = :name"),
+            {"name": report.statement_name},
+        ).scalars().all()
+        assert prepared == [report.statement_name]
+        assert report.statement_name in session.connection().info["prepared_reports"]
+
+def test_register_custom_report(engine, temp_data_dir):
+    """
+    Test that a registered report can be run by name with its own parameters.
+    """
+    _load_sample_data(engine, temp_data_dir)
+    report = queries.register_report(queries.Report(
+        "accounts_for_member",
+        "Accounts for Member",
+        'SELECT "ACCOUNT_GUID" FROM "ACCOUNTS" WHERE "MEMBER_GUID" = :member_guid ORDER BY "ACCOUNT_GUID"',
+        params=[queries.ReportParam("member_guid", "text", None)],
+        columns=["ACCOUNT_GUID"],
+    ))
+    try:
+        rows = queries.run_report("accounts_for_member", {"member_guid": "m1"})
+        assert [report.format_row(row) for row in rows] == ["ACCOUNT_GUID: a1", "ACCOUNT_GUID: a2"]
+    finally:
+        del queries.REPORTS["accounts_for_member"]
+
+def test_report_names_are_validated():
+    """
+    Test that report names must be identifiers and that statement names stay short and distinct.
+    """
+    for name in ("bad-name", "two words", "x; DROP TABLE t"):
+        with pytest.raises(ValueError, match="Invalid report name"):
+            queries.Report(name, "Title", "SELECT 1")
+
+    long_a = queries.Report("a" * 60 + "_one", "Title", "SELECT 1")
+    long_b = queries.Report("a" * 60 + "_two", "Title", "SELECT 1")
+    assert long_a.statement_name != long_b.statement_name
+    assert len(long_a.statement_name) < 63
@@ -0,0 +1,89 @@
+import os
+import pandas as pd
+import pytest
+from src import config, schema_builder, schema_cache
+
+def _write_schema(path, rows):
+    pd.DataFrame(rows).to_csv(path, index=False)
+
+def test_load_schema_compiles_tables_columns_and_types(tmp_path):
+    """
+    Test that the compiled schema matches the schema file, including ordinals and types.
+    """
+    schema_file = str(tmp_path / "INFORMATION_SCHEMA.csv")
+    _write_schema(schema_file, [
+        {"TABLE_NAME": "B_TABLE", "ORDINAL_POSITION": 1, "COLUMN_NAME": "AMOUNT", "DATA_TYPE": "NUMERIC(38,2)"},
+        {"TABLE_NAME": "B_TABLE", "ORDINAL_POSITION": 0, "COLUMN_NAME": "ID", "DATA_TYPE": "VARCHAR"},
+        {"TABLE_NAME": "A_TABLE", "ORDINAL_POSITION": 0, "COLUMN_NAME": "NAME", "DATA_TYPE": "VARCHAR"},
+    ])
+    schema = schema_cache.load_schema(schema_file)
+    assert list(schema.tables) == ["A_TABLE", "B_TABLE"]
+    assert schema.columns()["B_TABLE"] == ["AMOUNT", "ID"]
+    assert schema.column_types("B_TABLE") == {"AMOUNT": "NUMERIC(38,2)", "ID": "VARCHAR"}
+    assert [col.ordinal for col in schema.tables["B_TABLE"]] == [1, 0]
+    assert schema_builder.get_schema_columns(schema_file) == schema.columns()
+
+def test_load_schema_reads_from_disk_cache(tmp_path):
+    """
+    Test that a compiled schema is written to the cache and read back in a fresh process state.
+    """
+    schema_file = str(tmp_path / "INFORMATION_SCHEMA.csv")
+    _write_schema(schema_file, [{"TABLE_NAME": "T", "COLUMN_NAME": "ID", "DATA_TYPE": "numeric"}])
+    first = schema_cache.load_schema(schema_file)
+    cache_path = os.path.join(config.SCHEMA_CACHE_DIR, f"schema-{first.digest}.json")
+    assert os.path.exists(cache_path)
+
+    schema_cache._compiled.clear()
+    second = schema_cache.load_schema(schema_file)
+    assert second is not first
+    assert second.tables == first.tables
+
+def test_load_schema_recompiles_when_file_changes(tmp_path):
+    """
+    Test that editing the schema file invalidates the cached schema.
+    """
+    schema_file = str(tmp_path / "INFORMATION_SCHEMA.csv")
+    _write_schema(schema_file, [{"TABLE_NAME": "T", "COLUMN_NAME": "ID", "DATA_TYPE": "numeric"}])
+    assert schema_cache.load_schema(schema_file).columns() == {"T": ["ID"]}
+    _write_schema(schema_file, [
+        {"TABLE_NAME": "T", "COLUMN_NAME": "ID", "DATA_TYPE": "numeric"},
+        {"TABLE_NAME": "T", "COLUMN_NAME": "NAME", "DATA_TYPE": "varchar"},
+    ])
+    assert schema_cache.load_schema(schema_file).columns() == {"T": ["ID", "NAME"]}
+
+def test_load_schema_reads_declared_relationships(tmp_path):
+    """
+    Test that REFERENCES_TABLE/REFERENCES_COLUMN declare relationships and survive the disk cache.
+    """
+    schema_file = str(tmp_path / "INFORMATION_SCHEMA.csv")
+    _write_schema(schema_file, [
+        {"TABLE_NAME": "PARENT", "COLUMN_NAME": "ID", "DATA_TYPE": "varchar"},
+        {"TABLE_NAME": "CHILD", "COLUMN_NAME": "PARENT_ID", "DATA_TYPE": "varchar",
+         "REFERENCES_TABLE": "PARENT", "REFERENCES_COLUMN": "ID"},
+        {"TABLE_NAME": "OTHER", "COLUMN_NAME": "ID", "DATA_TYPE": "varchar", "REFERENCES_TABLE": "PARENT"},
+    ])
+    expected = [
+        schema_cache.Relationship("CHILD", "PARENT_ID", "PARENT", "ID"),
+        schema_cache.Relationship("OTHER", "ID", "PARENT", "ID"),
+    ]
+    assert schema_cache.load_schema(schema_file).relationships == expected
+    schema_cache._compiled.clear()
+    assert schema_cache.load_schema(schema_file).relationships == expected
+
+def test_compile_schema_accepts_short_rows_and_rejects_incomplete_ones():
+    """
+    Test that rows without the optional trailing columns are kept and rows without required values are errors.
+    """
+    content = (
+        b"TABLE_SCHEMA, TABLE_NAME, ORDINAL_POSITION, COLUMN_NAME, DATA_TYPE, REFERENCES_TABLE, REFERENCES_COLUMN\n"
+        b"dbo, ACCOUNTS, 0, ACCOUNT_GUID, VARCHAR\n"
+        b"dbo, ACCOUNTS, 1, MEMBER_GUID, VARCHAR, MEMBERS, MEMBER_GUID\n"
+        b"\n"
+        b"dbo, MEMBERS, 0, MEMBER_GUID, VARCHAR, ,\n"
+    )
+    schema = schema_cache.compile_schema(content, "digest")
+    assert schema.columns() == {"ACCOUNTS": ["ACCOUNT_GUID", "MEMBER_GUID"], "MEMBERS": ["MEMBER_GUID"]}
+    assert schema.relationships == [schema_cache.Relationship("ACCOUNTS", "MEMBER_GUID", "MEMBERS", "MEMBER_GUID")]
+
+    with pytest.raises(ValueError, match="line 3 is missing DATA_TYPE"):
+        schema_cache.compile_schema(content.replace(b"MEMBER_GUID, VARCHAR, MEMBERS", b"MEMBER_GUID, , MEMBERS"), "digest")
@@ -0,0 +1,220 @@
+import os
+import pandas as pd
+from sqlalchemy import text
+from src import schema_builder, watcher
+
+def _write_schema(data_dir):
+    """
+    Write a minimal schema with a single WATCH_TABLE and return its path.
+    """
+    schema_file = os.path.join(data_dir, "INFORMATION_SCHEMA.csv")
+    pd.DataFrame({
+        "TABLE_NAME": ["WATCH_TABLE", "WATCH_TABLE"],
+        "COLUMN_NAME": ["ID", "NAME"],
+        "DATA_TYPE": ["numeric", "varchar"]
+    }).to_csv(schema_file, index=False)
+    return schema_file
+
+def _count(engine):
+    with engine.connect() as conn:
+        return conn.execute(text('SELECT COUNT(*) FROM "WATCH_TABLE"')).scalar()
+
+def test_watcher_ingests_new_and_appended_rows(engine, tmp_path):
+    """
+    Test that a settled file is ingested once and that only appended rows are ingested afterwards.
+    """
+    data_dir = str(tmp_path)
+    schema_file = _write_schema(data_dir)
+    data_file = os.path.join(data_dir, "WATCH_TABLE.csv")
+    pd.DataFrame({"ID": [1, 2], "NAME": ["a", "b"]}).to_csv(data_file, index=False)
+
+    schema_builder.create_tables(schema_file, engine)
+    w = watcher.CsvWatcher(engine, data_dir=data_dir, schema_file=schema_file, batch_size=1)
+
+    # First poll only records the file signature; the second sees it unchanged
+    assert w.poll() == []
+    units = w.poll()
+    assert len(units) == 1
+    for unit in units:
+        w.ingest(*unit)
+    assert _count(engine) == 2
+
+    # Nothing new: no work
+    assert w.poll() == []
+
+    # Append rows without a header
+    with open(data_file, "a") as f:
+        f.write("3,c\n4,d\n")
+    assert w.poll() == []
+    units = w.poll()
+    assert len(units) == 1
+    assert units[0][2] > 0  # Starts after the previously ingested bytes
+    for unit in units:
+        w.ingest(*unit)
+    assert _count(engine) == 4
+
+def test_watcher_persists_offsets(engine, tmp_path):
+    """
+    Test that a restarted watcher with a state file does not re-ingest rows.
+    """
+    data_dir = str(tmp_path / "data")
+    os.makedirs(data_dir)
+    schema_file = _write_schema(data_dir)
+    state_file = str(tmp_path / "state.json")
+    pd.DataFrame({"NAME": ["x"], "ID": [1]}).to_csv(os.path.join(data_dir, "WATCH_TABLE.csv"), index=False)
+    schema_builder.create_tables(schema_file, engine)
+
+    w = watcher.CsvWatcher(engine, data_dir=data_dir, schema_file=schema_file, state_file=state_file)
+    w.poll()
+    for unit in w.poll():
+        w.ingest(*unit)
+    assert _count(engine) == 1
+
+    restarted = watcher.CsvWatcher(engine, data_dir=data_dir, schema_file=schema_file, state_file=state_file)
+    restarted.poll()
+    assert restarted.poll() == []
+    assert _count(engine) == 1
+
+def test_watcher_run_stops_gracefully(engine, tmp_path):
+    """
+    Test that run() drains queued work and returns after stop() is requested.
+    """
+    data_dir = str(tmp_path)
+    schema_file = _write_schema(data_dir)
+    pd.DataFrame({"ID": [1], "NAME": ["a"]}).to_csv(os.path.join(data_dir, "WATCH_TABLE.csv"), index=False)
+    schema_builder.create_tables(schema_file, engine)
+
+    w = watcher.CsvWatcher(engine, data_dir=data_dir, schema_file=schema_file, interval=0.01)
+    original_poll = w.poll
+    polls = []
+
+    def poll_then_stop():
+        units = original_poll()
+        polls.append(units)
+        if len(polls) == 2:
+            w.stop()
+        return units
+
+    w.poll = poll_then_stop
+    w.run()
+    assert _count(engine) == 1
+
+class _FailingOnceEngine:
+    """
+    Engine wrapper whose first begin() raises, as if the database were briefly unavailable.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.failed = False
+
+    def begin(self):
+        if not self.failed:
+            self.failed = True
+            raise RuntimeError("db down")
+        return self.engine.begin()
+
+def test_watcher_retries_failed_units(engine, tmp_path):
+    """
+    Test that rows from a unit whose insert failed are ingested on a later poll, header included.
+    """
+    data_dir = str(tmp_path)
+    schema_file = _write_schema(data_dir)
+    data_file = os.path.join(data_dir, "WATCH_TABLE.csv")
+    pd.DataFrame({"ID": [1, 2], "NAME": ["a", "b"]}).to_csv(data_file, index=False)
+    schema_builder.create_tables(schema_file, engine)
+
+    w = watcher.CsvWatcher(engine, data_dir=data_dir, schema_file=schema_file)
+    w.engine = _FailingOnceEngine(engine)
+    w.poll()
+    [unit] = w.poll()
+    assert w.ingest(*unit) == 0
+
+    # The failed range is queued again, and appended rows still use the header
+    with open(data_file, "a") as f:
+        f.write("3,c\n")
+    w.poll()
+    [unit] = w.poll()
+    assert unit[2] == 0
+    assert w.ingest(*unit) == 3
+    assert _count(engine) == 3
+
+def test_watcher_leaves_partial_lines_for_later(engine, tmp_path):
+    """
+    Test that a file ending mid-row is only ingested up to its last complete line.
+    """
+    data_dir = str(tmp_path)
+    schema_file = _write_schema(data_dir)
+    data_file = os.path.join(data_dir, "WATCH_TABLE.csv")
+    with open(data_file, "w") as f:
+        f.write("ID,NAME\n1,a\n2,b")
+    schema_builder.create_tables(schema_file, engine)
+
+    w = watcher.CsvWatcher(engine, data_dir=data_dir, schema_file=schema_file)
+    w.poll()
+    [unit] = w.poll()
+    assert w.ingest(*unit) == 1
+
+    with open(data_file, "a") as f:
+        f.write("cd\n")
+    w.poll()
+    [unit] = w.poll()
+    assert w.ingest(*unit) == 1
+    with engine.connect() as conn:
+        assert conn.execute(text('SELECT "NAME" FROM "WATCH_TABLE" WHERE "ID" = 2')).scalar() == "bcd"
+
+def test_watcher_never_ingests_a_range_twice(engine, tmp_path):
+    """
+    Test that a failed unit, polls while it is in flight and a repeated stale unit do not duplicate rows.
+    """
+    data_dir = str(tmp_path)
+    schema_file = _write_schema(data_dir)
+    data_file = os.path.join(data_dir, "WATCH_TABLE.csv")
+    pd.DataFrame({"ID": [1], "NAME": ["a"]}).to_csv(data_file, index=False)
+    schema_builder.create_tables(schema_file, engine)
+
+    w = watcher.CsvWatcher(engine, data_dir=data_dir, schema_file=schema_file)
+    w.engine = _FailingOnceEngine(engine)
+    w.poll()
+    [first] = w.poll()
+
+    # More rows arrive while the first unit is still queued
+    with open(data_file, "a") as f:
+        f.write("2,b\n")
+    assert w.poll() == []
+    assert w.poll() == []
+    assert w.ingest(*first) == 0  # Database down
+
+    [retry] = w.poll()
+    assert retry[2] == 0
+    assert w.ingest(*retry) == 2
+    # The same units delivered again are stale
+    assert w.ingest(*retry) == 0
+    assert w.ingest(*first) == 0
+    assert w.poll() == []
+    assert _count(engine) == 2
+
+def test_watcher_rereads_replaced_files(engine, tmp_path):
+    """
+    Test that a file replaced by a new file of larger size is read again from its header.
+    """
+    data_dir = str(tmp_path)
+    schema_file = _write_schema(data_dir)
+    data_file = os.path.join(data_dir, "WATCH_TABLE.csv")
+    pd.DataFrame({"ID": [1], "NAME": ["a"]}).to_csv(data_file, index=False)
+    schema_builder.create_tables(schema_file, engine)
+
+    w = watcher.CsvWatcher(engine, data_dir=data_dir, schema_file=schema_file)
+    w.poll()
+    [unit] = w.poll()
+    w.ingest(*unit)
+
+    replacement = os.path.join(str(tmp_path), "replacement.tmp")
+    pd.DataFrame({"NAME": ["b", "c"], "ID": [2, 3]}).to_csv(replacement, index=False)
+    os.replace(replacement, data_file)
+    w.poll()
+    [unit] = w.poll()
+    assert unit[2] == 0 and unit[4] is True
+    assert w.ingest(*unit) == 2
+    with engine.connect() as conn:
+        assert conn.execute(text('SELECT "NAME" FROM "WATCH_TABLE" WHERE "ID" = 3')).scalar() == "c"